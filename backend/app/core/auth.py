@@ -1,42 +1,114 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 import jwt
+import orjson
 import os
-import httpx
+import asyncio
+import base64
+import time
+from hashlib import blake2b
+from typing import Any
+from cachetools import TTLCache
+from app.core.http import get_http_client
 
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
 
 CLERK_ISSUER = os.getenv("CLERK_ISSUER")
 CLERK_AUDIENCE = os.getenv("CLERK_AUDIENCE")
 CLERK_JWKS_URL = f"{CLERK_ISSUER}/.well-known/jwks.json"
 
+# JWKS is refetched hourly so rotated keys are picked up without a restart
+JWKS_TTL_SECONDS = 60 * 60
+# An unknown kid forces a refetch at most this often, so forged tokens can't
+# drive one Clerk request each (and queue real logins behind the lock)
+JWKS_MIN_REFETCH_SECONDS = 60
+
 _jwks_cache = None
+_jwks_fetched_at = 0.0
+_jwks_lock = asyncio.Lock()
+
+# Parsed signing keys keyed by kid (avoids rebuilding the RSA key per request)
+_key_cache: dict[str, Any] = {}
+
+# Verified JWT payloads keyed by token digest (skips RS256 verify on hot tokens)
+_token_cache = TTLCache(maxsize=10000, ttl=30)
+
+def _jwks_is_fresh() -> bool:
+    return _jwks_cache is not None and time.monotonic() - _jwks_fetched_at < JWKS_TTL_SECONDS
 
 
 async def get_jwks():
-    global _jwks_cache
-    if _jwks_cache:
+    global _jwks_cache, _jwks_fetched_at
+    if _jwks_is_fresh():
         return _jwks_cache
 
-    async with httpx.AsyncClient() as client:
-        res = await client.get(CLERK_JWKS_URL)
+    # Single fetch for all concurrent misses
+    async with _jwks_lock:
+        if _jwks_is_fresh():
+            return _jwks_cache
+
+        res = await get_http_client().get(CLERK_JWKS_URL, timeout=5.0)
         res.raise_for_status()
-        _jwks_cache = res.json()
+        _jwks_cache = orjson.loads(res.content)
+        _jwks_fetched_at = time.monotonic()
+
+        # Drop parsed keys that are no longer published
+        live_kids = {k.get("kid") for k in _jwks_cache.get("keys", [])}
+        for kid in list(_key_cache):
+            if kid not in live_kids:
+                del _key_cache[kid]
+
         return _jwks_cache
 
 
-async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-):
-    token = credentials.credentials
+async def _get_signing_key(kid: str):
+    """
+    Return the parsed public key for a kid.
+    On a miss the JWKS is refetched once so rotated keys are picked up,
+    unless it was fetched within JWKS_MIN_REFETCH_SECONDS.
+    """
+    global _jwks_cache
+    key = _key_cache.get(kid)
+    if key is not None:
+        return key
 
-    try:
+    for _ in range(2):
         jwks = await get_jwks()
-        header = jwt.get_unverified_header(token)
-
-        key = next(
-            k for k in jwks["keys"] if k["kid"] == header["kid"]
-        )
+        for jwk in jwks["keys"]:
+            if jwk.get("kid") == kid:
+                try:
+                    key = jwt.PyJWK(jwk).key
+                except jwt.InvalidKeyError:
+                    break
+                _key_cache[kid] = key
+                return key
+        # Unknown or unusable kid - keys may have rotated, refetch once
+        if time.monotonic() - _jwks_fetched_at < JWKS_MIN_REFETCH_SECONDS:
+            break
+        _jwks_cache = None
+
+    raise jwt.InvalidKeyError(f"No signing key found for kid {kid}")
+
+
+def _token_kid(token: str) -> str:
+    """Read the kid from the JWT header without a full PyJWT decode."""
+    header_b64 = token.split(".", 1)[0]
+    header = orjson.loads(base64.urlsafe_b64decode(header_b64 + "=" * (-len(header_b64) % 4)))
+    return header["kid"]
+
+
+async def _verify_token(token: str) -> dict:
+    """
+    Verify a Clerk JWT and return the user dict.
+    Verified payloads are cached briefly by token digest; expiry is
+    still enforced on every cache hit.
+    """
+    cache_key = blake2b(token.encode(), digest_size=16).digest()
+
+    payload = _token_cache.get(cache_key)
+    if payload is None or payload["exp"] - time.time() <= 0:
+        key = await _get_signing_key(_token_kid(token))
 
         payload = jwt.decode(
             token,
@@ -44,12 +116,23 @@ async def get_current_user(
             algorithms=["RS256"],
             audience=CLERK_AUDIENCE,
             issuer=CLERK_ISSUER,
+            options={"require": ["exp", "sub", "aud", "iss"]},
         )
+        _token_cache[cache_key] = payload
+
+    return {
+        "user_id": payload["sub"],
+        "email": payload.get("email"),
+    }
+
 
-        return {
-            "user_id": payload["sub"],
-            "email": payload.get("email"),
-        }
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+):
+    token = credentials.credentials
+
+    try:
+        return await _verify_token(token)
 
     except Exception:
         raise HTTPException(
@@ -59,7 +142,7 @@ async def get_current_user(
 
 
 async def get_current_user_optional(
-    credentials: HTTPAuthorizationCredentials | None = Depends(HTTPBearer(auto_error=False)),
+    credentials: HTTPAuthorizationCredentials | None = Depends(optional_security),
 ):
     """Optional authentication - returns demo user if not authenticated"""
     if not credentials:
@@ -67,24 +150,6 @@ async def get_current_user_optional(
     
     try:
         token = credentials.credentials
-        jwks = await get_jwks()
-        header = jwt.get_unverified_header(token)
-
-        key = next(
-            k for k in jwks["keys"] if k["kid"] == header["kid"]
-        )
-
-        payload = jwt.decode(
-            token,
-            key,
-            algorithms=["RS256"],
-            audience=CLERK_AUDIENCE,
-            issuer=CLERK_ISSUER,
-        )
-
-        return {
-            "user_id": payload["sub"],
-            "email": payload.get("email"),
-        }
+        return await _verify_token(token)
     except Exception:
         return {"user_id": "demo_user", "email": "demo@example.com"}
@@ -1,5 +1,9 @@
+import heapq
 import json
+import time
+import fnmatch
 import redis.asyncio as redis
+from collections import Counter, OrderedDict
 from typing import Any, Optional
 from app.core.config import settings
 
@@ -38,49 +42,256 @@ async def close_redis():
 
 
 # -----------------------------
-# CACHE HELPERS (REDIS-BACKED)
+# L1 CACHE (IN-PROCESS)
+# -----------------------------
+class TinyLFUCache:
+    """
+    LRU + TTL cache with TinyLFU-style admission.
+    When full, a new key only replaces the LRU victim if it has been
+    requested at least as often, so one-shot keys cannot flush hot ones.
+    Frequencies are halved periodically so old popularity decays.
+    Expiry times sit in a min-heap, so expired entries are found without a scan.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._freq: Counter = Counter()
+        # (expires_at, key); entries for overwritten/removed keys are skipped lazily
+        self._expiry: list[tuple[float, str]] = []
+        self._sample_size = maxsize * 10
+        self._events = 0
+
+    def _record(self, key: str):
+        self._freq[key] += 1
+        self._events += 1
+        if self._events >= self._sample_size:
+            self._freq = Counter({k: c // 2 for k, c in self._freq.items() if c > 1})
+            self._events = 0
+
+    def _evict_expired(self, now: float):
+        while self._expiry and self._expiry[0][0] <= now:
+            expires_at, key = heapq.heappop(self._expiry)
+            item = self._data.get(key)
+            if item is not None and item[0] == expires_at:
+                del self._data[key]
+
+    def _push_expiry(self, expires_at: float, key: str):
+        heapq.heappush(self._expiry, (expires_at, key))
+        # Compact once dead entries dominate (amortized O(1) per insert)
+        if len(self._expiry) > 2 * self.maxsize:
+            self._expiry = [(item[0], k) for k, item in self._data.items()]
+            heapq.heapify(self._expiry)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        self._record(key)
+        item = self._data.get(key)
+        if item is None:
+            return default
+        expires_at, value = item
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            return default
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any, ttl: float | None = None):
+        """Store value for min(ttl, self.ttl) seconds (subject to admission)."""
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0:
+            self._data.pop(key, None)
+            return
+        now = time.monotonic()
+        if key not in self._data and len(self._data) >= self.maxsize:
+            self._evict_expired(now)
+            if len(self._data) >= self.maxsize:
+                victim = next(iter(self._data))
+                if self._freq[key] < self._freq[victim]:
+                    return  # Not admitted
+                del self._data[victim]
+        self._data[key] = (now + ttl, value)
+        self._data.move_to_end(key)
+        self._push_expiry(now + ttl, key)
+
+    def pop(self, key: str, default: Any = None) -> Any:
+        item = self._data.pop(key, None)
+        return default if item is None else item[1]
+
+    def keys(self) -> list[str]:
+        return list(self._data.keys())
+
+
+# Values are shared between callers - treat them as read-only.
+# L1 is per worker and deletes don't reach other workers, so it only holds
+# keys that are overwritten or expire but are never invalidated on write.
+# Hot tier: per-category news lists (few keys, every request reads them)
+_news_cache = TinyLFUCache(maxsize=settings.CACHE_L1_NEWS_MAXSIZE, ttl=settings.CACHE_L1_TTL)
+# Cold tier: per-article / per-text results
+_local_cache = TinyLFUCache(maxsize=settings.CACHE_L1_MAXSIZE, ttl=settings.CACHE_L1_TTL)
+
+NEWS_KEY_PREFIX = "gnews:"
+L1_KEY_PREFIXES = ("sentiment:", "summary:", "paywall:", "article:content:")
+
+
+def _l1_for(key: str) -> TinyLFUCache | None:
+    """Pick the in-process tier for a key by prefix (None = Redis only)."""
+    if key.startswith(NEWS_KEY_PREFIX):
+        return _news_cache
+    if key.startswith(L1_KEY_PREFIXES):
+        return _local_cache
+    return None
+
+
+def _l1_pop(key: str):
+    l1 = _l1_for(key)
+    if l1 is not None:
+        l1.pop(key, None)
+
+
+# -----------------------------
+# CACHE HELPERS (L1 MEMORY + L2 REDIS)
 # -----------------------------
 async def get_from_cache(key: str) -> Optional[Any]:
     """
-    Retrieve value from Redis cache
+    Retrieve value from the in-process cache, then Redis
     Returns: Deserialized value or None
     """
+    l1 = _l1_for(key)
+    if l1 is not None:
+        value = l1.get(key)
+        if value is not None:
+            return value
+
     try:
         client = await get_redis()
         if client is None:
             return None
-        value = await client.get(key)
+        if l1 is None:
+            value = await client.get(key)
+            return json.loads(value) if value else None
+
+        # PTTL alongside GET so the L1 copy never outlives the Redis key
+        async with client.pipeline(transaction=False) as pipe:
+            pipe.get(key)
+            pipe.pttl(key)
+            value, pttl = await pipe.execute()
         if value:
-            return json.loads(value)
+            value = json.loads(value)
+            if pttl > 0:
+                l1.set(key, value, pttl / 1000)
+            return value
         return None
     except Exception as e:
         print(f"[REDIS GET ERROR] {key}: {e}")
         return None
 
 
+async def get_many_from_cache(keys: list[str]) -> dict[str, Any]:
+    """
+    Batch version of get_from_cache: L1 first, one MGET for the misses
+    Returns: {key: value} for keys that were found
+    """
+    found = {}
+    missing = []
+    for key in keys:
+        l1 = _l1_for(key)
+        value = l1.get(key) if l1 is not None else None
+        if value is not None:
+            found[key] = value
+        else:
+            missing.append(key)
+
+    if not missing:
+        return found
+
+    # PTTLs for the L1-eligible misses ride along in the same round trip
+    l1_missing = [key for key in missing if _l1_for(key) is not None]
+    try:
+        client = await get_redis()
+        if client is None:
+            return found
+        async with client.pipeline(transaction=False) as pipe:
+            pipe.mget(missing)
+            for key in l1_missing:
+                pipe.pttl(key)
+            raw_values, *pttls = await pipe.execute()
+    except Exception as e:
+        print(f"[REDIS MGET ERROR] {len(missing)} keys: {e}")
+        # Fall back to one GET per key
+        for key in missing:
+            value = await get_from_cache(key)
+            if value is not None:
+                found[key] = value
+        return found
+
+    ttls = dict(zip(l1_missing, pttls))
+    for key, raw in zip(missing, raw_values):
+        if raw:
+            value = json.loads(raw)
+            found[key] = value
+            pttl = ttls.get(key, 0)
+            if pttl > 0:
+                _l1_for(key).set(key, value, pttl / 1000)
+    return found
+
+
 async def set_in_cache(key: str, value: Any, ttl: int = None):
     """
-    Store value in Redis cache with optional TTL
+    Store value in the in-process cache and Redis with optional TTL
     :param key: cache key
     :param value: value to cache (will be JSON-serialized)
     :param ttl: time-to-live in seconds (default: CACHE_TTL_NEWS)
     """
+    if ttl is None:
+        ttl = settings.CACHE_TTL_NEWS
+
+    l1 = _l1_for(key)
+    if l1 is not None:
+        l1.set(key, value, ttl)
+
     try:
         client = await get_redis()
         if client is None:
             return
         serialized = json.dumps(value)
         
-        if ttl is None:
-            ttl = settings.CACHE_TTL_NEWS
-        
         await client.setex(key, ttl, serialized)
     except Exception as e:
         print(f"[REDIS SET ERROR] {key}: {e}")
 
 
+async def set_many_in_cache(items: dict[str, Any], ttl: int = None):
+    """
+    Batch version of set_in_cache: one pipelined round trip of SETEX commands
+    :param items: {key: value} (values will be JSON-serialized)
+    :param ttl: time-to-live in seconds for every key (default: CACHE_TTL_NEWS)
+    """
+    if not items:
+        return
+    if ttl is None:
+        ttl = settings.CACHE_TTL_NEWS
+
+    for key, value in items.items():
+        l1 = _l1_for(key)
+        if l1 is not None:
+            l1.set(key, value, ttl)
+
+    try:
+        client = await get_redis()
+        if client is None:
+            return
+        async with client.pipeline(transaction=False) as pipe:
+            for key, value in items.items():
+                pipe.setex(key, ttl, json.dumps(value))
+            await pipe.execute()
+    except Exception as e:
+        print(f"[REDIS MSET ERROR] {len(items)} keys: {e}")
+
+
 async def delete_from_cache(key: str):
-    """Delete key from Redis cache"""
+    """Delete key from the in-process cache and Redis"""
+    _l1_pop(key)
     try:
         client = await get_redis()
         if client is None:
@@ -90,8 +301,26 @@ async def delete_from_cache(key: str):
         print(f"[REDIS DELETE ERROR] {key}: {e}")
 
 
+async def delete_many_from_cache(keys: list[str]):
+    """Delete several keys from the in-process cache and Redis in one DEL"""
+    if not keys:
+        return
+    for key in keys:
+        _l1_pop(key)
+    try:
+        client = await get_redis()
+        if client is None:
+            return
+        await client.delete(*keys)
+    except Exception as e:
+        print(f"[REDIS DELETE ERROR] {keys}: {e}")
+
+
 async def clear_pattern(pattern: str):
     """Delete all keys matching a pattern"""
+    for l1 in (_news_cache, _local_cache):
+        for key in fnmatch.filter(l1.keys(), pattern):
+            l1.pop(key, None)
     try:
         client = await get_redis()
         if client is None:
@@ -102,3 +331,26 @@ async def clear_pattern(pattern: str):
     except Exception as e:
         print(f"[REDIS CLEAR ERROR] {pattern}: {e}")
 
+
+# -----------------------------
+# PER-USER DERIVED KEYS
+# -----------------------------
+def user_analytics_key(user_id: str) -> str:
+    return f"analytics:{user_id}"
+
+
+def profile_stats_key(user_id: str) -> str:
+    return f"profile:stats:{user_id}"
+
+
+def profile_analytics_key(user_id: str) -> str:
+    return f"profile:analytics:{user_id}"
+
+
+def user_cache_keys(user_id: str) -> list[str]:
+    """Keys derived from a user's saved items and reads; drop them when those change."""
+    return [
+        user_analytics_key(user_id),
+        profile_stats_key(user_id),
+        profile_analytics_key(user_id),
+    ]
@@ -1,8 +1,11 @@
 import os
+from dataclasses import dataclass
+from functools import lru_cache
 from dotenv import load_dotenv
 
 load_dotenv()
 
+@dataclass(frozen=True, slots=True)
 class Settings:
     APP_NAME: str = "NewsAura Backend"
     APP_VERSION: str = "1.0.0"
@@ -13,6 +16,15 @@ class Settings:
 
     # Mongo
     MONGO_URI: str = os.getenv("MONGO_URI", "")
+    MONGO_MAX_POOL_SIZE: int = int(os.getenv("MONGO_MAX_POOL_SIZE", 200))
+    MONGO_MIN_POOL_SIZE: int = int(os.getenv("MONGO_MIN_POOL_SIZE", 20))
+    MONGO_MAX_IDLE_TIME_MS: int = int(os.getenv("MONGO_MAX_IDLE_TIME_MS", 30000))
+    MONGO_SERVER_SELECTION_TIMEOUT_MS: int = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", 3000))
+    # Wire compression; zstd needs the zstandard package (in requirements.txt)
+    MONGO_COMPRESSORS: str = os.getenv("MONGO_COMPRESSORS", "zstd")
+    # Docs per getMore for list endpoints; keeps each batch small instead of
+    # the driver's default of filling up to 16 MiB
+    MONGO_CURSOR_BATCH_SIZE: int = int(os.getenv("MONGO_CURSOR_BATCH_SIZE", 200))
 
     # -----------------------------
     # REDIS CONFIG
@@ -29,6 +41,51 @@ class Settings:
     # CACHE TTL (STRICT)
     # -----------------------------
     CACHE_TTL_NEWS: int = 60 * 15  # 15 minutes (DO NOT LOWER)
+    # Category feeds are served for this long past CACHE_TTL_NEWS while refreshing
+    CACHE_STALE_NEWS: int = 60 * 5  # 5 minutes
+
+    # Background warming of missing category feeds. The reserve keeps that
+    # many daily GNews hits for user-triggered fetches.
+    NEWS_WARMUP_INTERVAL: int = int(os.getenv("NEWS_WARMUP_INTERVAL", 60 * 14))
+    NEWS_WARMUP_QUOTA_RESERVE: int = int(os.getenv("NEWS_WARMUP_QUOTA_RESERVE", 50))
+    # Summaries: generated ones are stable; description/placeholder fallbacks
+    # and "scrape found nothing" markers are retried sooner
+    CACHE_TTL_SUMMARY: int = 60 * 60 * 24  # 24 hours
+    CACHE_TTL_SUMMARY_FALLBACK: int = 60 * 60  # 1 hour
+    CACHE_TTL_PAYWALL: int = 60 * 60 * 24  # 24 hours
+    # Model output for a given text never changes; headlines repeat across polls
+    CACHE_TTL_SENTIMENT: int = 60 * 60 * 23  # 23 hours
+    CACHE_TTL_ANALYTICS: int = 60  # Per-user chat/profile analytics (invalidated on saves and reads)
+    # user_analytics view documents older than this are rebuilt from the raw
+    # collections on read, repairing any write lost to a concurrent rebuild
+    USER_ANALYTICS_REBUILD_INTERVAL: int = 60 * 60  # 1 hour
+
+    # In-process L1 in front of Redis (short TTL bounds cross-worker staleness)
+    # News lists and their search blobs (gnews:*) get their own small tier so
+    # one-shot keys can't evict them
+    CACHE_L1_NEWS_MAXSIZE: int = int(os.getenv("CACHE_L1_NEWS_MAXSIZE", 32))
+    CACHE_L1_MAXSIZE: int = int(os.getenv("CACHE_L1_MAXSIZE", 1000))
+    CACHE_L1_TTL: int = int(os.getenv("CACHE_L1_TTL", 30))
+
+    # -----------------------------
+    # SENTIMENT MODEL
+    # -----------------------------
+    # Token cap per text; headline + description + GNews snippet fit well within it
+    SENTIMENT_MAX_TOKENS: int = int(os.getenv("SENTIMENT_MAX_TOKENS", 256))
+    # int8 dynamic quantization of the Linear layers (CPU speedup, tiny accuracy cost)
+    SENTIMENT_QUANTIZE: bool = os.getenv("SENTIMENT_QUANTIZE", "true").lower() == "true"
+    # "torch" or "onnx" (ONNX Runtime, needs optimum[onnxruntime]; falls back to torch)
+    SENTIMENT_BACKEND: str = os.getenv("SENTIMENT_BACKEND", "torch").lower()
+
+    # -----------------------------
+    # SUMMARIZER WORKERS
+    # -----------------------------
+    SUMMARY_WORKERS: int = int(os.getenv("SUMMARY_WORKERS", min(4, os.cpu_count() or 1)))
+    SUMMARY_TIMEOUT: float = float(os.getenv("SUMMARY_TIMEOUT", "15"))  # seconds
+    SUMMARY_SCRAPE_TIMEOUT: float = float(os.getenv("SUMMARY_SCRAPE_TIMEOUT", "5"))  # seconds
+    # summary_logs are buffered and written in batches
+    SUMMARY_LOG_BATCH_SIZE: int = int(os.getenv("SUMMARY_LOG_BATCH_SIZE", 100))
+    SUMMARY_LOG_FLUSH_INTERVAL: float = float(os.getenv("SUMMARY_LOG_FLUSH_INTERVAL", "2"))  # seconds
 
     # -----------------------------
     # OLLAMA LLM CONFIG (CHATBOT ONLY)
@@ -39,4 +96,11 @@ class Settings:
     OLLAMA_MODEL: str = os.getenv("OLLAMA_MODEL", "llama3.2:1b")
     OLLAMA_TIMEOUT: float = float(os.getenv("OLLAMA_TIMEOUT", "90"))  # seconds (allow headroom for larger context)
 
-settings = Settings()
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Build settings once; env vars are read a single time."""
+    return Settings()
+
+
+settings = get_settings()
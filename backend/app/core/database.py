@@ -21,9 +21,27 @@ class MongoDB:
             raise ValueError("MONGO_URI is not set. Please configure it in the .env file.")
 
         if cls.client is None:
-            cls.client = AsyncIOMotorClient(settings.MONGO_URI)
+            cls.client = AsyncIOMotorClient(
+                settings.MONGO_URI,
+                maxPoolSize=settings.MONGO_MAX_POOL_SIZE,
+                minPoolSize=settings.MONGO_MIN_POOL_SIZE,
+                maxIdleTimeMS=settings.MONGO_MAX_IDLE_TIME_MS,
+                serverSelectionTimeoutMS=settings.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+                compressors=settings.MONGO_COMPRESSORS,
+            )
             print("[OK] MongoDB connected (async)")
 
+    @classmethod
+    async def ping(cls):
+        """
+        Round-trip to the server so the pool starts opening
+        connections before the first request arrives.
+        """
+        if cls.client is None:
+            raise RuntimeError("MongoDB client is not initialized. Call MongoDB.connect() first.")
+
+        await cls.client.admin.command("ping")
+
     @classmethod
     def close(cls):
         """
@@ -3,14 +3,34 @@ GNews API Hit Counter
 Tracks API calls for rate limiting (100 requests/day free tier)
 """
 
-from datetime import datetime
+import logging
+import time
+from datetime import datetime, timedelta, timezone, time as dt_time
 from typing import Dict
-from app.core.cache import get_from_cache, set_in_cache, delete_from_cache
+from app.core.cache import get_redis, delete_from_cache
+
+logger = logging.getLogger(__name__)
+
+# Today's counter key, rebuilt only when the UTC day changes
+_key_cache = {"ord": -1, "key": ""}
+
+
+_next_midnight_epoch = 0
+
+
+def _next_midnight_utc_epoch() -> int:
+    """Unix timestamp of the next midnight UTC (counter expiry), recomputed once a day."""
+    global _next_midnight_epoch
+    if time.time() >= _next_midnight_epoch:
+        tomorrow = datetime.now(timezone.utc).date() + timedelta(days=1)
+        _next_midnight_epoch = int(datetime.combine(tomorrow, dt_time.min, tzinfo=timezone.utc).timestamp())
+    return _next_midnight_epoch
+
 
 class GNewsCounter:
     """
     Central counter for GNews API hits
-    Uses cache to persist across requests
+    Uses an atomic Redis counter shared by all workers
     Resets daily at midnight UTC
     """
     
@@ -21,8 +41,24 @@ class GNewsCounter:
     @staticmethod
     def get_today_key() -> str:
         """Get cache key for today"""
-        date_str = datetime.utcnow().strftime("%Y-%m-%d")
-        return f"{GNewsCounter.CACHE_KEY}:{date_str}"
+        now = datetime.utcnow()
+        ordinal = now.toordinal()
+        if ordinal != _key_cache["ord"]:
+            _key_cache["key"] = f"{GNewsCounter.CACHE_KEY}:{now:%Y-%m-%d}"
+            _key_cache["ord"] = ordinal
+        return _key_cache["key"]
+
+    @staticmethod
+    async def _get_hits() -> int:
+        """Read today's hit count (0 if Redis is unavailable)"""
+        try:
+            client = await get_redis()
+            if client is None:
+                return 0
+            return int(await client.get(GNewsCounter.get_today_key()) or 0)
+        except Exception as e:
+            logger.error("[GNEWS COUNTER] Failed to read hits: %s", e)
+            return 0
     
     @staticmethod
     async def increment_hit() -> Dict[str, int]:
@@ -31,15 +67,18 @@ class GNewsCounter:
         Returns: {"today_hits": int, "remaining_hits": int, "warning": bool}
         """
         cache_key = GNewsCounter.get_today_key()
-        
-        # Get current count (default 0 if not set)
-        current_hits = await get_from_cache(cache_key) or 0
-        
-        # Increment
-        new_hits = current_hits + 1
-        
-        # Store back in cache with 24-hour TTL
-        await set_in_cache(cache_key, new_hits, ttl=86400)
+        new_hits = 0
+
+        try:
+            client = await get_redis()
+            if client is not None:
+                # INCR + EXPIREAT in one round trip; no read-modify-write race
+                async with client.pipeline(transaction=True) as pipe:
+                    pipe.incr(cache_key)
+                    pipe.expireat(cache_key, _next_midnight_utc_epoch())
+                    new_hits, _ = await pipe.execute()
+        except Exception as e:
+            logger.error("[GNEWS COUNTER] Failed to increment hits: %s", e)
         
         remaining = max(0, GNewsCounter.MAX_HITS_PER_DAY - new_hits)
         is_warning = new_hits >= GNewsCounter.WARNING_THRESHOLD
@@ -57,10 +96,7 @@ class GNewsCounter:
         Get current hit status without incrementing
         Returns: {"today_hits": int, "remaining_hits": int}
         """
-        cache_key = GNewsCounter.get_today_key()
-        
-        # Get current count (default 0 if not set)
-        current_hits = await get_from_cache(cache_key) or 0
+        current_hits = await GNewsCounter._get_hits()
         remaining = max(0, GNewsCounter.MAX_HITS_PER_DAY - current_hits)
         is_warning = current_hits >= GNewsCounter.WARNING_THRESHOLD
         
@@ -77,8 +113,7 @@ class GNewsCounter:
         Check if we can make another API call
         Returns: (can_call: bool, message: str)
         """
-        cache_key = GNewsCounter.get_today_key()
-        current_hits = await get_from_cache(cache_key) or 0
+        current_hits = await GNewsCounter._get_hits()
         
         if current_hits >= GNewsCounter.MAX_HITS_PER_DAY:
             return (
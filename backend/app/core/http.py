@@ -0,0 +1,49 @@
+import httpx
+
+# Shared outbound client (GNews, Clerk JWKS, Ollama). HTTP/2 multiplexes
+# requests to the same TLS origin over one connection. Accept-Encoding is left to httpx,
+# which advertises br/zstd only when brotli/zstandard are installed to decode them.
+_client: httpx.AsyncClient | None = None
+# Article scraping gets its own smaller pool so slow third-party sites can't
+# hold connections the API calls (auth, GNews) need
+_scrape_client: httpx.AsyncClient | None = None
+
+
+def init_http_client() -> httpx.AsyncClient:
+    """Create the shared client. Called once at application startup."""
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=100),
+            http2=True,
+            timeout=httpx.Timeout(10.0, connect=3.0),
+        )
+    return _client
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the shared client, creating it lazily outside the app lifecycle."""
+    return _client if _client is not None else init_http_client()
+
+
+def get_scrape_client() -> httpx.AsyncClient:
+    """Return the article-scraping client, created on first use."""
+    global _scrape_client
+    if _scrape_client is None:
+        _scrape_client = httpx.AsyncClient(
+            limits=httpx.Limits(max_keepalive_connections=10, max_connections=20),
+            http2=True,
+            timeout=httpx.Timeout(10.0, connect=3.0),
+        )
+    return _scrape_client
+
+
+async def close_http_client():
+    """Close the shared clients. Called during application shutdown."""
+    global _client, _scrape_client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+    if _scrape_client is not None:
+        await _scrape_client.aclose()
+        _scrape_client = None
@@ -3,105 +3,153 @@ MongoDB index creation for performance optimization.
 Indexes are critical for query performance at scale.
 """
 
+import asyncio
 import logging
+from pymongo import IndexModel, ASCENDING, DESCENDING
+from pymongo.errors import OperationFailure
 from app.core.database import MongoDB
 
 logger = logging.getLogger(__name__)
 
 
-async def create_indexes():
-    """
-    Create indexes for all collections.
-    Called once during application startup.
-    """
-    
-    db = MongoDB.get_database()
-    
-    try:
-        # --------------------------------------------------
-        # BOOKMARKS COLLECTION
-        # --------------------------------------------------
+# --------------------------------------------------
+# INDEX DEFINITIONS (one createIndexes command per collection)
+# --------------------------------------------------
+INDEXES = {
+    "bookmarks": [
         # Compound index for duplicate checking (user_id + article_id)
-        await db.bookmarks.create_index(
-            [("user_id", 1), ("article_id", 1)],
+        IndexModel(
+            [("user_id", ASCENDING), ("article_id", ASCENDING)],
             unique=True,
             name="idx_user_article_unique"
-        )
-        
-        # Index for fetching user's bookmarks (sorted by created_at)
-        await db.bookmarks.create_index(
-            [("user_id", 1), ("created_at", -1)],
-            name="idx_user_created"
-        )
-        
-        logger.info("[OK] Bookmarks indexes created")
-        
-        # --------------------------------------------------
-        # COMMENTS COLLECTION
-        # --------------------------------------------------
+        ),
+        # Index for fetching user's bookmarks (newest first, _id breaks ties)
+        IndexModel(
+            [("user_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+            name="idx_user_created_id"
+        ),
+        # Index for chatbot article lookups by exact URL
+        IndexModel(
+            [("user_id", ASCENDING), ("url", ASCENDING)],
+            name="idx_user_url"
+        ),
+        # Index for per-user category breakdowns
+        IndexModel(
+            [("user_id", ASCENDING), ("category", ASCENDING)],
+            name="idx_user_category"
+        ),
+    ],
+    "comments": [
         # Index for fetching article's comments (sorted by created_at)
-        await db.comments.create_index(
-            [("article_id", 1), ("created_at", -1)],
+        IndexModel(
+            [("article_id", ASCENDING), ("created_at", DESCENDING)],
             name="idx_article_created"
-        )
-        
+        ),
         # Compound index for user's comments (_id + user_id) for faster lookups
-        await db.comments.create_index(
-            [("_id", 1), ("user_id", 1)],
+        IndexModel(
+            [("_id", ASCENDING), ("user_id", ASCENDING)],
             name="idx_id_user"
-        )
-        
-        logger.info("[OK] Comments indexes created")
-        
-        # --------------------------------------------------
-        # READ LATER COLLECTION
-        # --------------------------------------------------
+        ),
+    ],
+    "read_later": [
         # Compound index for duplicate checking (user_id + article_id)
-        await db.read_later.create_index(
-            [("user_id", 1), ("article_id", 1)],
+        IndexModel(
+            [("user_id", ASCENDING), ("article_id", ASCENDING)],
             unique=True,
             name="idx_user_article_unique"
-        )
-        
-        # Index for fetching user's read later items (sorted by created_at)
-        await db.read_later.create_index(
-            [("user_id", 1), ("created_at", -1)],
-            name="idx_user_created"
-        )
-        
-        logger.info("[OK] Read Later indexes created")
-        
-        # --------------------------------------------------
-        # FEEDBACK COLLECTION
-        # --------------------------------------------------
+        ),
+        # Index for fetching user's read later items (newest first, _id breaks ties)
+        IndexModel(
+            [("user_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+            name="idx_user_created_id"
+        ),
+        # Index for chatbot article lookups by exact URL
+        IndexModel(
+            [("user_id", ASCENDING), ("url", ASCENDING)],
+            name="idx_user_url"
+        ),
+        # Index for per-user category breakdowns
+        IndexModel(
+            [("user_id", ASCENDING), ("category", ASCENDING)],
+            name="idx_user_category"
+        ),
+    ],
+    "feedback": [
         # Index for sorting/filtering feedback by date
-        await db.feedback.create_index(
-            [("created_at", -1)],
+        IndexModel(
+            [("created_at", DESCENDING)],
             name="idx_created"
-        )
-        
+        ),
         # Optional: Index for searching by email (if needed for support)
-        await db.feedback.create_index(
-            [("email", 1)],
+        IndexModel(
+            [("email", ASCENDING)],
             sparse=True,  # Only index documents with email field
             name="idx_email"
-        )
-        
-        logger.info("[OK] Feedback indexes created")
-
-        # --------------------------------------------------
-        # SUMMARY LOGS COLLECTION
-        # --------------------------------------------------
-        await db.summary_logs.create_index(
-            [("user_id", 1), ("created_at", -1)],
+        ),
+    ],
+    "chat_messages": [
+        # Index for chat history (user's latest messages first)
+        IndexModel(
+            [("user_id", ASCENDING), ("created_at", DESCENDING)],
+            name="idx_chat_user_created"
+        ),
+    ],
+    "summary_logs": [
+        IndexModel(
+            [("user_id", ASCENDING), ("created_at", DESCENDING)],
             name="idx_summary_user_created"
-        )
+        ),
+    ],
+}
+
+
+# Indexes superseded by the definitions above; dropped at startup so writes
+# don't keep maintaining them on existing databases
+OBSOLETE_INDEXES = {
+    # Replaced by idx_user_created_id (created_at + _id pagination order)
+    "bookmarks": ["idx_user_created"],
+    "read_later": ["idx_user_created"],
+}
+
+# NamespaceNotFound, IndexNotFound: already gone
+_ALREADY_DROPPED_CODES = {26, 27}
+
+
+async def _sync_indexes(db, name: str, models: list[IndexModel]):
+    """Create a collection's indexes, then drop the ones they replace."""
+    await db[name].create_indexes(models)
+    for index_name in OBSOLETE_INDEXES.get(name, []):
+        try:
+            await db[name].drop_index(index_name)
+            logger.info(f"[OK] Dropped obsolete {name} index {index_name}")
+        except OperationFailure as e:
+            if e.code not in _ALREADY_DROPPED_CODES:
+                raise
+
+
+async def create_indexes():
+    """
+    Create indexes for all collections.
+    Called once during application startup.
+    """
+    
+    db = MongoDB.get_database()
+
+    # One batched command per collection (plus obsolete drops), all collections concurrently
+    results = await asyncio.gather(
+        *(_sync_indexes(db, name, models) for name, models in INDEXES.items()),
+        return_exceptions=True,
+    )
+
+    failed = False
+    for name, result in zip(INDEXES, results):
+        if isinstance(result, Exception):
+            failed = True
+            logger.error(f"[ERROR] Error creating {name} indexes: {result}")
+        else:
+            logger.info(f"[OK] {name} indexes created")
 
-        logger.info("[OK] Summary logs indexes created")
-        
+    if not failed:
         logger.info("[OK] All MongoDB indexes created successfully")
-        
-    except Exception as e:
-        logger.error(f"[ERROR] Error creating indexes: {e}")
-        # Don't raise - allow app to start even if indexes fail
-        # Indexes can be created manually if needed
+    # Don't raise - allow app to start even if indexes fail
+    # Indexes can be created manually if needed
@@ -2,21 +2,27 @@
 
 import logging
 import os
-from logging.handlers import RotatingFileHandler
+import queue
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Optional
 
 
-def configure_logging() -> None:
+def configure_logging() -> Optional[QueueListener]:
     """Configure structured logging for the FastAPI app.
 
     - Sends logs to stdout (picked up by uvicorn) and to a rotating file.
+    - Log calls only enqueue records; a background listener thread does the I/O.
     - Respects LOG_LEVEL env var; defaults to INFO.
+
+    Returns the started listener (stop it on shutdown to flush), or None if
+    logging was already configured.
     """
 
     root_logger = logging.getLogger()
     
     # Check if logging is already configured to prevent duplicate handlers
     if root_logger.handlers:
-        return
+        return None
 
     log_level = os.getenv("LOG_LEVEL", "INFO").upper()
 
@@ -37,7 +43,7 @@ def configure_logging() -> None:
             stream_handler.stream.reconfigure(encoding='utf-8')
         except Exception:
             pass  # Fallback gracefully if reconfigure fails
-    root_logger.addHandler(stream_handler)
+    handlers = [stream_handler]
 
     # Rotating file handler (optional, skip if path not provided)
     log_file = os.getenv("LOG_FILE", "logs/app.log")
@@ -45,14 +51,22 @@ def configure_logging() -> None:
         os.makedirs(os.path.dirname(log_file), exist_ok=True)
         file_handler = RotatingFileHandler(log_file, maxBytes=1_000_000, backupCount=3)
         file_handler.setFormatter(formatter)
-        root_logger.addHandler(file_handler)
+        handlers.append(file_handler)
     except OSError:
         # Fail silently if file handler cannot be created; stdout still works.
         pass
 
+    # Request path only enqueues; the listener thread writes to stdout/file
+    log_queue: queue.Queue = queue.Queue(-1)
+    root_logger.addHandler(QueueHandler(log_queue))
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+
     # Reduce noise from overly chatty libraries
     logging.getLogger("httpx").setLevel(logging.WARNING)
     logging.getLogger("asyncio").setLevel(logging.WARNING)
 
     root_logger.info("Logging configured", extra={"level": log_level})
 
+    return listener
+
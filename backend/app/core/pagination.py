@@ -0,0 +1,34 @@
+"""
+Keyset pagination for per-user lists, newest first.
+
+The cursor is the (created_at, _id) of the last item on the previous page;
+_id breaks created_at ties so the order is total and pages never overlap.
+"""
+
+from datetime import datetime
+from bson import ObjectId
+from fastapi import HTTPException
+
+# Served by the (user_id, created_at, _id) indexes
+NEWEST_FIRST = [("created_at", -1), ("_id", -1)]
+
+
+def encode_cursor(doc: dict) -> str:
+    """Cursor pointing just past doc."""
+    return f"{doc['created_at'].isoformat()}_{doc['_id']}"
+
+
+def cursor_filter(cursor: str) -> dict:
+    """Query clause selecting items after the cursor in NEWEST_FIRST order."""
+    created_at, _, item_id = cursor.rpartition("_")
+    try:
+        created_at = datetime.fromisoformat(created_at)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not ObjectId.is_valid(item_id):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    return {"$or": [
+        {"created_at": {"$lt": created_at}},
+        {"created_at": created_at, "_id": {"$lt": ObjectId(item_id)}},
+    ]}
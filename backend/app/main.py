@@ -1,12 +1,16 @@
+import asyncio
 import logging
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.database import MongoDB
 from app.core.logging import configure_logging
 from app.core.indexes import create_indexes
 from app.core.cache import get_redis, close_redis
+from app.core.http import init_http_client, close_http_client
 from app.services.sentiment_ml import SentimentService, _load_model
 from app.services.chat_llm import chat_llm
+from app.services.summarizer import init_summary_pool, close_summary_pool
 
 
 from app.routers import (
@@ -28,6 +32,7 @@ app = FastAPI(
     title="NewsAura Backend",
     description="News Aggregation & NLP Backend ",
     version="1.0.0",
+    default_response_class=ORJSONResponse,
 )
 
 # --------------------------------------------------
@@ -76,8 +81,15 @@ logger = logging.getLogger(__name__)
 
 @app.on_event("startup")
 async def startup_event():
-    configure_logging()
+    app.state.log_listener = configure_logging()
     MongoDB.connect()
+    # ✅ Warm up the connection pool; do not block startup on failure
+    try:
+        await MongoDB.ping()
+    except Exception as exc:
+        logger.warning("[MONGO] Warmup ping failed: %s", exc)
+    # ✅ One pooled HTTP client for all outbound calls
+    init_http_client()
     await create_indexes()
     # ✅ Initialize Redis connection on startup without blocking app availability
     try:
@@ -100,13 +112,33 @@ async def startup_event():
             print("[OLLAMA] Ollama not available; chatbot will use rule-based fallbacks")
     except Exception as exc:
         logger.warning("[OLLAMA] Warmup check failed; chatbot will use fallbacks: %s", exc)
+    # ✅ Summaries run in worker processes so they never block the event loop
+    init_summary_pool()
+    # ✅ Batch summary_logs writes in the background
+    app.state.summary_log_task = asyncio.create_task(summary.summary_log_flusher())
+    # ✅ Keep category feeds warm in the background (quota-guarded)
+    app.state.news_warmup_task = asyncio.create_task(news.warmup_loop())
 
 @app.on_event("shutdown")
 async def shutdown_event():
+    warmup_task = getattr(app.state, "news_warmup_task", None)
+    if warmup_task:
+        warmup_task.cancel()
+    # ✅ Let the summary log flusher drain before Mongo goes away
+    summary_log_task = getattr(app.state, "summary_log_task", None)
+    if summary_log_task:
+        summary_log_task.cancel()
+        await asyncio.gather(summary_log_task, return_exceptions=True)
     MongoDB.close()
+    await close_http_client()
+    close_summary_pool()
     # ✅ Close Redis connection on shutdown
     try:
         await close_redis()
         print("[REDIS] Disconnected from Redis cache")
     except Exception as exc:
         logger.warning("[REDIS] Shutdown cleanup failed: %s", exc)
+    # ✅ Flush queued log records last
+    listener = getattr(app.state, "log_listener", None)
+    if listener:
+        listener.stop()
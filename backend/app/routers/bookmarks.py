@@ -1,12 +1,28 @@
-from fastapi import APIRouter, Depends, HTTPException
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException, Query
 from app.core.database import get_db
 from app.models.bookmark import BookmarkModel
 from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
 from app.core.auth import get_current_user_optional
+from app.core.cache import delete_many_from_cache, user_cache_keys
+from app.core.pagination import NEWEST_FIRST, cursor_filter, encode_cursor
+from app.services.user_analytics import UserAnalyticsService, SAVED_ITEM_VIEW_PROJECTION
 
 
 router = APIRouter()
 
+# Fields needed to render a bookmark card
+BOOKMARK_PROJECTION = {
+    "article_id": 1,
+    "title": 1,
+    "source": 1,
+    "category": 1,
+    "url": 1,
+    "image_url": 1,
+    "created_at": 1,
+}
+
 
 # --------------------------------------------------
 # ADD BOOKMARK
@@ -19,18 +35,19 @@ async def add_bookmark(
 ):
     user_id = user["user_id"]
 
-    existing = await db.bookmarks.find_one({
-        "user_id": user_id,
-        "article_id": bookmark.article_id
-    })
-
-    if existing:
-        raise HTTPException(status_code=400, detail="Already bookmarked")
-
     data = bookmark.dict()
     data["user_id"] = user_id
 
-    result = await db.bookmarks.insert_one(data)
+    # Unique (user_id, article_id) index rejects duplicates atomically
+    try:
+        result = await db.bookmarks.insert_one(data)
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail="Already bookmarked")
+
+    await asyncio.gather(
+        delete_many_from_cache(user_cache_keys(user_id)),
+        UserAnalyticsService.record_saved(db, "bookmarks", data),
+    )
 
     return {
         "message": "Bookmark added",
@@ -44,23 +61,34 @@ async def add_bookmark(
 # --------------------------------------------------
 @router.get("/")
 async def get_bookmarks(
+    limit: int | None = Query(None, ge=1, le=200),
+    cursor: str | None = None,
     user=Depends(get_current_user_optional),
     db=Depends(get_db),
 ):
+    """Newest first. Without a limit the full list is returned."""
     user_id = user["user_id"]
 
-    bookmarks = []
-    cursor = db.bookmarks.find(
-        {"user_id": user_id}
-    ).sort("created_at", -1)
+    query = {"user_id": user_id}
+    if cursor:
+        # Keyset pagination: continue after the last item of the previous page
+        query.update(cursor_filter(cursor))
+
+    find = db.bookmarks.find(query, BOOKMARK_PROJECTION).sort(NEWEST_FIRST)
+    if limit:
+        find = find.limit(limit)
+    docs = await find.to_list(length=limit)
+
+    next_cursor = encode_cursor(docs[-1]) if limit and len(docs) == limit else None
 
-    async for item in cursor:
+    # Projected docs are already response-shaped; skip the model round-trip
+    for item in docs:
         item["_id"] = str(item["_id"])
-        bookmarks.append(BookmarkModel(**item))
 
     return {
-        "count": len(bookmarks),
-        "bookmarks": bookmarks
+        "count": len(docs),
+        "bookmarks": docs,
+        "next_cursor": next_cursor,
     }
 
 
@@ -74,18 +102,26 @@ async def delete_bookmark(
     user=Depends(get_current_user_optional),
     db=Depends(get_db),
 ):
+    if not ObjectId.is_valid(bookmark_id):
+        raise HTTPException(status_code=400, detail="Invalid id")
+
     user_id = user["user_id"]
 
-    result = await db.bookmarks.delete_one({
-        "_id": ObjectId(bookmark_id),
-        "user_id": user_id
-    })
+    removed = await db.bookmarks.find_one_and_delete(
+        {"_id": ObjectId(bookmark_id), "user_id": user_id},
+        projection=SAVED_ITEM_VIEW_PROJECTION,
+    )
 
-    if result.deleted_count == 0:
+    if removed is None:
         raise HTTPException(
             status_code=404,
             detail="Bookmark not found or not authorized"
         )
 
+    await asyncio.gather(
+        delete_many_from_cache(user_cache_keys(user_id)),
+        UserAnalyticsService.record_removed(db, "bookmarks", user_id, removed),
+    )
+
     return {"message": "Bookmark removed"}
 
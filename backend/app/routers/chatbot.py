@@ -7,25 +7,31 @@ NO external news calls. NO hallucinations.
 Uses Ollama LLM for natural conversational responses with safe fallbacks.
 """
 
+import asyncio
+import json
 import logging
 import re
-from datetime import datetime
+import time
+from collections import Counter
+from datetime import datetime, timedelta
 from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException
+from bson import ObjectId
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
 from app.core.database import get_db
 from app.core.auth import get_current_user_optional
-from app.core.cache import get_from_cache
-from app.services.summarizer import TextSummarizer
+from app.core.cache import get_from_cache, get_many_from_cache, set_in_cache, user_analytics_key
+from app.core.config import settings
 from app.services.chat_llm import chat_llm, get_fallback_message
+from app.services.news_service import GNewsService
 
 # Categories matching the news feed cache keys
 NEWS_CATEGORIES = ["general", "nation", "business", "technology", "sports", "entertainment", "health"]
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
-summarizer = TextSummarizer()
 
 
 # --------------------------------------------------
@@ -131,111 +137,170 @@ INTENT_PATTERNS = {
 }
 
 
+# One compiled alternation per intent, checked in INTENT_PATTERNS order
+# (first matching intent wins, as before)
+INTENT_REGEXES = [
+    (intent, re.compile("|".join(f"(?:{pattern})" for pattern in patterns)))
+    for intent, patterns in INTENT_PATTERNS.items()
+]
+
+
 def detect_intent(message: str) -> str:
     """Detect user intent from message using keyword patterns."""
     message_lower = message.lower().strip()
-    
-    for intent, patterns in INTENT_PATTERNS.items():
-        for pattern in patterns:
-            if re.search(pattern, message_lower):
-                return intent
-    
+
+    for intent, regex in INTENT_REGEXES:
+        if regex.search(message_lower):
+            return intent
+
     return "general_query"
 
 
 # --------------------------------------------------
 # Context Aggregation Helpers
 # --------------------------------------------------
+# Fields used by the LLM context builder and the fallback generators
+SAVED_ITEM_PROJECTION = {
+    "_id": 1,
+    "article_id": 1,
+    "title": 1,
+    "source": 1,
+    "category": 1,
+    "sentiment": 1,
+    "url": 1,
+    "created_at": 1,
+}
+
+
 async def get_user_bookmarks(db, user_id: str, limit: int = 20) -> list:
     """Fetch user's recent bookmarks."""
-    cursor = db.bookmarks.find(
-        {"user_id": user_id}
-    ).sort("created_at", -1).limit(limit)
-    
-    return [doc async for doc in cursor]
+    return await db.bookmarks.find(
+        {"user_id": user_id}, projection=SAVED_ITEM_PROJECTION
+    ).sort("created_at", -1).limit(limit).to_list(length=limit)
 
 
 async def get_user_read_later(db, user_id: str, limit: int = 20) -> list:
     """Fetch user's read later items."""
-    cursor = db.read_later.find(
-        {"user_id": user_id}
-    ).sort("created_at", -1).limit(limit)
-    
-    return [doc async for doc in cursor]
+    return await db.read_later.find(
+        {"user_id": user_id}, projection=SAVED_ITEM_PROJECTION
+    ).sort("created_at", -1).limit(limit).to_list(length=limit)
 
 
 async def get_user_summaries(db, user_id: str, limit: int = 10) -> list:
     """Fetch user's summary logs."""
-    cursor = db.summary_logs.find(
+    return await db.summary_logs.find(
         {"user_id": user_id}
-    ).sort("created_at", -1).limit(limit)
-    
-    return [doc async for doc in cursor]
+    ).sort("created_at", -1).limit(limit).to_list(length=limit)
+
+
+async def _get_news_caches() -> list:
+    """Fetch every category's cached feed in one round trip."""
+    keys = [f"gnews:{category}" for category in NEWS_CATEGORIES]
+    cached = await get_many_from_cache(keys)
+    return [cached[key] for key in keys if cached.get(key)]
+
+
+# Concurrent chats share one feed fetch per window: {limit: (fetched_at, articles)}
+NEWS_MEMO_TTL_SECONDS = 5
+_news_memo: dict[int, tuple[float, list]] = {}
+_news_memo_lock = asyncio.Lock()
 
 
 async def get_cached_news_articles(limit_per_category: int = 10) -> list:
+    """Fetch cached news articles (memoized for a few seconds; treat as read-only)."""
+    memo = _news_memo.get(limit_per_category)
+    if memo and time.monotonic() - memo[0] < NEWS_MEMO_TTL_SECONDS:
+        return memo[1]
+    
+    async with _news_memo_lock:
+        memo = _news_memo.get(limit_per_category)
+        if memo and time.monotonic() - memo[0] < NEWS_MEMO_TTL_SECONDS:
+            return memo[1]
+        articles = await _collect_news_articles(limit_per_category)
+        _news_memo[limit_per_category] = (time.monotonic(), articles)
+        return articles
+
+
+async def _collect_news_articles(limit_per_category: int) -> list:
     """Fetch cached news articles from Redis (the actual news feed)."""
-    all_articles = []
-    seen_ids = set()
-    for category in NEWS_CATEGORIES:
-        cache_key = f"gnews:{category}"
-        cached = await get_from_cache(cache_key)
-        if not cached:
-            continue
+    # Insertion-ordered dict dedupes and keeps the first occurrence
+    articles_by_id = {}
+    for cached in await _get_news_caches():
         for article in cached[:limit_per_category]:
             article_id = article.get("id") or article.get("url")
-            if article_id and article_id not in seen_ids:
-                seen_ids.add(article_id)
-                all_articles.append(article)
-    return all_articles
+            if article_id:
+                articles_by_id.setdefault(article_id, article)
+    return list(articles_by_id.values())
 
 
 async def find_article_in_cache(article_id: str) -> Optional[dict]:
-    """Find a specific article in the Redis news cache."""
-    for category in NEWS_CATEGORIES:
-        cache_key = f"gnews:{category}"
-        cached = await get_from_cache(cache_key)
-        if not cached:
-            continue
+    """Find a specific article in the Redis news cache (with its full content)."""
+    for cached in await _get_news_caches():
         for article in cached:
             if article.get("id") == article_id or article.get("url") == article_id:
-                return article
+                content = await GNewsService.get_cached_content(article.get("id"))
+                # Cached feed entries are shared; attach content on a copy
+                return {**article, "content": content} if content else article
     return None
 
 
+def _saved_items_facet(user_id: str) -> list:
+    """Count, category and sentiment breakdown for one collection in a single pass."""
+    return [
+        {"$match": {"user_id": user_id}},
+        {"$facet": {
+            "count": [{"$count": "n"}],
+            "cats": [
+                {"$match": {"category": {"$ne": None}}},
+                {"$group": {"_id": "$category", "c": {"$sum": 1}}},
+            ],
+            "sent": [
+                {"$match": {"sentiment.label": {"$in": ["Positive", "Neutral", "Negative"]}}},
+                {"$group": {"_id": "$sentiment.label", "c": {"$sum": 1}}},
+            ],
+        }},
+    ]
+
+
+async def _run_facet(collection, user_id: str) -> dict:
+    rows = await collection.aggregate(_saved_items_facet(user_id)).to_list(length=1)
+    return rows[0] if rows else {"count": [], "cats": [], "sent": []}
+
+
 async def get_user_analytics(db, user_id: str) -> dict:
-    """Get analytics data for the user."""
-    bookmarks_count = await db.bookmarks.count_documents({"user_id": user_id})
-    read_later_count = await db.read_later.count_documents({"user_id": user_id})
-    articles_read = await db.summary_logs.count_documents({"user_id": user_id})
+    """Get analytics data for the user (cached briefly, dropped on saves)."""
+    cache_key = user_analytics_key(user_id)
+    cached = await get_from_cache(cache_key)
+    if cached is not None:
+        return cached
+    
+    analytics = await _compute_user_analytics(db, user_id)
+    await set_in_cache(cache_key, analytics, ttl=settings.CACHE_TTL_ANALYTICS)
+    return analytics
+
+
+async def _compute_user_analytics(db, user_id: str) -> dict:
+    bm_facet, rl_facet, articles_read = await asyncio.gather(
+        _run_facet(db.bookmarks, user_id),
+        _run_facet(db.read_later, user_id),
+        db.summary_logs.count_documents({"user_id": user_id}),
+    )
+    
+    bookmarks_count = bm_facet["count"][0]["n"] if bm_facet["count"] else 0
+    read_later_count = rl_facet["count"][0]["n"] if rl_facet["count"] else 0
     
     # Category breakdown
-    category_counts = {}
-    for collection in (db.bookmarks, db.read_later):
-        pipeline = [
-            {"$match": {"user_id": user_id, "category": {"$exists": True, "$ne": None}}},
-            {"$group": {"_id": "$category", "count": {"$sum": 1}}},
-        ]
-        async for row in collection.aggregate(pipeline):
-            cat = row.get("_id")
-            if cat:
-                category_counts[cat] = category_counts.get(cat, 0) + row.get("count", 0)
-    
-    top_category = max(category_counts.items(), key=lambda x: x[1])[0] if category_counts else None
+    category_counts = Counter()
+    for facet in (bm_facet, rl_facet):
+        category_counts.update({row["_id"]: row.get("c", 0) for row in facet["cats"] if row.get("_id")})
+    
+    top_category = category_counts.most_common(1)[0][0] if category_counts else None
     
     # Sentiment breakdown
     sentiment_counts = {"Positive": 0, "Neutral": 0, "Negative": 0}
-    for collection in (db.bookmarks, db.read_later):
-        cursor = collection.find(
-            {"user_id": user_id, "sentiment": {"$exists": True}},
-            projection={"sentiment": 1}
-        )
-        async for row in cursor:
-            sentiment = row.get("sentiment")
-            if isinstance(sentiment, dict):
-                label = sentiment.get("label")
-                if label in sentiment_counts:
-                    sentiment_counts[label] += 1
+    for facet in (bm_facet, rl_facet):
+        for row in facet["sent"]:
+            sentiment_counts[row["_id"]] += row.get("c", 0)
     
     return {
         "bookmarks_count": bookmarks_count,
@@ -243,40 +308,147 @@ async def get_user_analytics(db, user_id: str) -> dict:
         "articles_read": articles_read,
         "total_saved": bookmarks_count + read_later_count,
         "top_category": top_category,
-        "category_breakdown": category_counts,
+        "category_breakdown": dict(category_counts),
         "sentiment_breakdown": sentiment_counts,
     }
 
 
+async def get_user_counts(db, user_id: str) -> dict:
+    """Counts-only analytics for intents that don't need breakdowns."""
+    # estimated_document_count() reads whole-collection metadata, so it can't
+    # answer per-user counts; these use the user_id index instead.
+    bookmarks_count, read_later_count, articles_read = await asyncio.gather(
+        db.bookmarks.count_documents({"user_id": user_id}),
+        db.read_later.count_documents({"user_id": user_id}),
+        db.summary_logs.count_documents({"user_id": user_id}),
+    )
+    return {
+        "bookmarks_count": bookmarks_count,
+        "read_later_count": read_later_count,
+        "articles_read": articles_read,
+        "total_saved": bookmarks_count + read_later_count,
+    }
+
+
 async def get_article_by_id(db, user_id: str, article_id: str) -> Optional[dict]:
     """Find a specific article in user's saved items."""
-    # Check bookmarks first
-    article = await db.bookmarks.find_one({
-        "user_id": user_id,
-        "$or": [
-            {"article_id": article_id},
-            {"_id": article_id},
-            {"url": {"$regex": article_id, "$options": "i"}},
-        ]
-    })
-    
-    if not article:
-        # Check read later
-        article = await db.read_later.find_one({
-            "user_id": user_id,
-            "$or": [
-                {"article_id": article_id},
-                {"_id": article_id},
-                {"url": {"$regex": article_id, "$options": "i"}},
-            ]
-        })
-    
-    return article
+    # Exact matches first (served by the user_id+article_id / user_id+url indexes)
+    exact = [{"article_id": article_id}, {"url": article_id}]
+    if ObjectId.is_valid(article_id):
+        exact.append({"_id": ObjectId(article_id)})
+    query = {"user_id": user_id, "$or": exact}
+    
+    bookmark, read_later = await asyncio.gather(
+        db.bookmarks.find_one(query),
+        db.read_later.find_one(query),
+    )
+    if bookmark or read_later:
+        # Bookmarks take precedence
+        return bookmark or read_later
+    
+    # Last resort: partial URL match (unindexed, so only after exact lookups miss)
+    query = {"user_id": user_id, "url": {"$regex": re.escape(article_id), "$options": "i"}}
+    bookmark, read_later = await asyncio.gather(
+        db.bookmarks.find_one(query),
+        db.read_later.find_one(query),
+    )
+    return bookmark or read_later
 
 
 # --------------------------------------------------
 # Context Builder for LLM
 # --------------------------------------------------
+# Each section builder returns its lines plus a trailing blank line, or "".
+ANALYTICS_TEMPLATE = (
+    "=== USER ANALYTICS ===\n"
+    "Total saved articles: {total_saved}\n"
+    "Bookmarks: {bookmarks_count}\n"
+    "Read later items: {read_later_count}\n"
+    "Articles summarized: {articles_read}\n"
+)
+
+
+def _source_name(item: dict) -> str:
+    source = item.get('source', 'Unknown')
+    if isinstance(source, dict):
+        source = source.get('name', 'Unknown')
+    return source
+
+
+def _article_section(article: Optional[dict]) -> str:
+    if not article:
+        return ""
+    lines = [
+        "=== CURRENT ARTICLE ===",
+        f"Title: {article.get('title', 'Untitled')}",
+        f"Source: {_source_name(article)}",
+        f"Category: {article.get('category', 'general')}",
+    ]
+    if article.get('content'):
+        lines.append(f"Content: {article.get('content')[:600]}")
+    elif article.get('description'):
+        lines.append(f"Description: {article.get('description')[:400]}")
+    if isinstance(article.get('sentiment'), dict):
+        lines.append(f"Sentiment: {article['sentiment'].get('label', 'Unknown')}")
+    lines.append("")
+    return "\n".join(lines)
+
+
+def _analytics_section(analytics: dict) -> str:
+    section = ANALYTICS_TEMPLATE.format_map({
+        "total_saved": analytics.get('total_saved', 0),
+        "bookmarks_count": analytics.get('bookmarks_count', 0),
+        "read_later_count": analytics.get('read_later_count', 0),
+        "articles_read": analytics.get('articles_read', 0),
+    })
+    if analytics.get('top_category'):
+        section += f"Top category: {analytics['top_category']}\n"
+    cats = analytics.get('category_breakdown')
+    if cats:
+        section += f"Category breakdown: {', '.join(f'{k}: {v}' for k, v in cats.items())}\n"
+    sentiment = analytics.get('sentiment_breakdown')
+    if sentiment:
+        section += f"Sentiment distribution: Positive={sentiment.get('Positive', 0)}, Neutral={sentiment.get('Neutral', 0)}, Negative={sentiment.get('Negative', 0)}\n"
+    return section
+
+
+def _sentiment_suffix(item: dict) -> str:
+    sentiment = item.get('sentiment')
+    return f" [{sentiment.get('label', '')}]" if isinstance(sentiment, dict) else ""
+
+
+def _saved_item_line(i: int, item: dict) -> str:
+    get = item.get
+    return f"{i}. {(get('title') or 'Untitled')[:80]} — {_source_name(item)} ({get('category', 'general')})"
+
+
+def _bookmarks_section(bookmarks: list) -> str:
+    if not bookmarks:
+        return ""
+    lines = [
+        _saved_item_line(i, item) + _sentiment_suffix(item)
+        for i, item in enumerate(bookmarks[:10], 1)
+    ]
+    return "=== RECENT BOOKMARKS ===\n" + "\n".join(lines) + "\n"
+
+
+def _read_later_section(read_later: list) -> str:
+    if not read_later:
+        return ""
+    lines = [_saved_item_line(i, item) for i, item in enumerate(read_later[:10], 1)]
+    return "=== READ LATER ITEMS ===\n" + "\n".join(lines) + "\n"
+
+
+def _news_feed_section(cached_articles: Optional[list]) -> str:
+    if not cached_articles:
+        return ""
+    lines = [
+        f"{i}. [{item.get('category', 'general').upper()}] {(item.get('title') or 'Untitled')[:80]} — {_source_name(item)}"
+        for i, item in enumerate(cached_articles[:8], 1)
+    ]
+    return "=== CURRENT NEWS FEED (Latest Articles) ===\n" + "\n".join(lines) + "\n"
+
+
 def build_llm_context(
     bookmarks: list,
     read_later: list,
@@ -289,81 +461,14 @@ def build_llm_context(
     Build a context string from user data for the LLM.
     This ensures the LLM ONLY has access to user's saved data.
     """
-    context_parts = []
-    
-    # Add specific article context if provided
-    if article:
-        context_parts.append("=== CURRENT ARTICLE ===")
-        context_parts.append(f"Title: {article.get('title', 'Untitled')}")
-        source = article.get('source', 'Unknown')
-        if isinstance(source, dict):
-            source = source.get('name', 'Unknown')
-        context_parts.append(f"Source: {source}")
-        context_parts.append(f"Category: {article.get('category', 'general')}")
-        if article.get('content'):
-            context_parts.append(f"Content: {article.get('content')[:600]}")
-        elif article.get('description'):
-            context_parts.append(f"Description: {article.get('description')[:400]}")
-        if isinstance(article.get('sentiment'), dict):
-            sentiment = article['sentiment']
-            context_parts.append(f"Sentiment: {sentiment.get('label', 'Unknown')}")
-        context_parts.append("")
-    
-    # Add analytics summary
-    context_parts.append("=== USER ANALYTICS ===")
-    context_parts.append(f"Total saved articles: {analytics.get('total_saved', 0)}")
-    context_parts.append(f"Bookmarks: {analytics.get('bookmarks_count', 0)}")
-    context_parts.append(f"Read later items: {analytics.get('read_later_count', 0)}")
-    context_parts.append(f"Articles summarized: {analytics.get('articles_read', 0)}")
-    
-    if analytics.get('top_category'):
-        context_parts.append(f"Top category: {analytics['top_category']}")
-    
-    if analytics.get('category_breakdown'):
-        cats = analytics['category_breakdown']
-        context_parts.append(f"Category breakdown: {', '.join(f'{k}: {v}' for k, v in cats.items())}")
-    
-    if analytics.get('sentiment_breakdown'):
-        sentiment = analytics['sentiment_breakdown']
-        context_parts.append(f"Sentiment distribution: Positive={sentiment.get('Positive', 0)}, Neutral={sentiment.get('Neutral', 0)}, Negative={sentiment.get('Negative', 0)}")
-    context_parts.append("")
-    
-    # Add recent bookmarks
-    if bookmarks:
-        context_parts.append("=== RECENT BOOKMARKS ===")
-        for i, item in enumerate(bookmarks[:10], 1):
-            title = item.get('title', 'Untitled')[:80]
-            source = item.get('source', 'Unknown')
-            cat = item.get('category', 'general')
-            sentiment_info = ""
-            if isinstance(item.get('sentiment'), dict):
-                sentiment_info = f" [{item['sentiment'].get('label', '')}]"
-            context_parts.append(f"{i}. {title} — {source} ({cat}){sentiment_info}")
-        context_parts.append("")
-    
-    # Add read later items
-    if read_later:
-        context_parts.append("=== READ LATER ITEMS ===")
-        for i, item in enumerate(read_later[:10], 1):
-            title = item.get('title', 'Untitled')[:80]
-            source = item.get('source', 'Unknown')
-            cat = item.get('category', 'general')
-            context_parts.append(f"{i}. {title} — {source} ({cat})")
-        context_parts.append("")
-
-    # Add cached news feed articles (skip if a specific article is already provided to keep context small)
-    if cached_articles and not article:
-        context_parts.append("=== CURRENT NEWS FEED (Latest Articles) ===")
-        for i, item in enumerate(cached_articles[:8], 1):
-            title = item.get('title', 'Untitled')[:80]
-            source = item.get('source', 'Unknown')
-            if isinstance(source, dict):
-                source = source.get('name', 'Unknown')
-            cat = item.get('category', 'general')
-            context_parts.append(f"{i}. [{cat.upper()}] {title} — {source}")
-        context_parts.append("")
-    
-    return "\n".join(context_parts)
+    return "\n".join(filter(None, [
+        _article_section(article),
+        _analytics_section(analytics),
+        _bookmarks_section(bookmarks),
+        _read_later_section(read_later),
+        # Skip the feed if a specific article is already provided to keep context small
+        _news_feed_section(None if article else cached_articles),
+    ]))
 
 
 # --------------------------------------------------
@@ -467,6 +572,10 @@ def generate_article_qa_response(article: Optional[dict], question: str) -> str:
     return response
 
 
+# Ten-segment progress bars indexed by filled segments (0-10)
+_BARS = tuple("█" * n + "░" * (10 - n) for n in range(11))
+
+
 def generate_top_topics_response(analytics: dict) -> str:
     """Explain user's reading patterns."""
     category_breakdown = analytics.get("category_breakdown", {})
@@ -482,11 +591,9 @@ def generate_top_topics_response(analytics: dict) -> str:
         response += f"Your top category is **{top_cat.title()}**!\n\n"
     
     response += "**Category Breakdown:**\n"
-    sorted_cats = sorted(category_breakdown.items(), key=lambda x: x[1], reverse=True)
-    
-    for cat, count in sorted_cats[:5]:
+    for cat, count in Counter(category_breakdown).most_common(5):
         percentage = (count / total * 100) if total > 0 else 0
-        bar = "█" * int(percentage / 10) + "░" * (10 - int(percentage / 10))
+        bar = _BARS[min(int(percentage / 10), 10)]
         response += f"• {cat.title()}: {bar} {count} ({percentage:.0f}%)\n"
     
     return response.strip()
@@ -627,9 +734,7 @@ def generate_greeting_response(analytics: dict) -> str:
     return response
 
 
-def generate_help_response() -> str:
-    """List chatbot capabilities."""
-    return """🤖 **NewsAura AI Capabilities**
+HELP_RESPONSE_TEXT = """🤖 **NewsAura AI Capabilities**
 
 **What I can do:**
 • "Summarize my saved articles" — Get an overview of all your bookmarks
@@ -645,10 +750,7 @@ Click "Ask AI" on any article card to ask questions about specific articles.
 
 _I only use your saved articles and reading history — no external lookups!_"""
 
-
-def generate_fallback_response(message: str) -> str:
-    """Fallback for unrecognized intents."""
-    return f"""I'm not sure how to help with that specific request.
+FALLBACK_RESPONSE_TEXT = """I'm not sure how to help with that specific request.
 
 **Try asking me things like:**
 • "Summarize my saved articles"
@@ -659,12 +761,174 @@ def generate_fallback_response(message: str) -> str:
 Or click "Ask AI" on an article card for article-specific questions!"""
 
 
+def generate_help_response() -> str:
+    """List chatbot capabilities."""
+    return HELP_RESPONSE_TEXT
+
+
+def generate_fallback_response(message: str) -> str:
+    """Fallback for unrecognized intents."""
+    return FALLBACK_RESPONSE_TEXT
+
+
+# --------------------------------------------------
+# Chat History Storage
+# --------------------------------------------------
+async def store_chat_exchange(db, user_id: str, message: str, reply: str, intent: str, used_llm: bool):
+    """Persist the user message and assistant reply; failures are logged only."""
+    # One timestamp for the pair; +1ms keeps the reply after the message
+    # (Mongo stores dates at millisecond precision)
+    now = datetime.utcnow()
+    try:
+        await db.chat_messages.insert_many([
+            {
+                "user_id": user_id,
+                "role": "user",
+                "content": message,
+                "created_at": now,
+            },
+            {
+                "user_id": user_id,
+                "role": "assistant",
+                "content": reply,
+                "intent": intent,
+                "used_llm": used_llm,
+                "created_at": now + timedelta(milliseconds=1),
+            },
+        ], ordered=False)
+    except Exception as e:
+        logger.warning("[CHATBOT] Failed to store chat: %s", e)
+
+
+# --------------------------------------------------
+# Shared Chat Pipeline
+# --------------------------------------------------
+def _intent_sources(intent: str) -> list[str]:
+    """Data sources reported back to the client for an intent."""
+    if intent in ("summarize_saved", "article_qa", "explain_simple", "compare_articles"):
+        return ["bookmarks", "read_later", "news_cache"]
+    if intent in ("daily_briefing", "read_recommendation", "similar_read", "news_feed"):
+        return ["bookmarks", "read_later", "analytics", "news_cache"]
+    if intent in ("top_topics", "sentiment_insight", "greeting"):
+        return ["analytics"]
+    if intent == "help":
+        return []
+    return ["bookmarks", "read_later", "analytics", "news_cache"]
+
+
+async def _load_chat_context(db, user_id: str, intent: str, article_id: Optional[str]) -> dict:
+    """Fetch saved items, analytics, cached news and the referenced article."""
+    # Fetch user data + cached news concurrently
+    bookmarks, read_later, analytics, cached_articles = await asyncio.gather(
+        get_user_bookmarks(db, user_id),
+        get_user_read_later(db, user_id),
+        get_user_analytics(db, user_id),
+        get_cached_news_articles(limit_per_category=3),
+    )
+    
+    # Fetch specific article if referenced
+    article = None
+    if article_id:
+        # Look up saved items and the news cache together; saved items win
+        saved, cached = await asyncio.gather(
+            get_article_by_id(db, user_id, article_id),
+            find_article_in_cache(article_id),
+            return_exceptions=True,
+        )
+        if isinstance(saved, BaseException):
+            logger.warning("[CHATBOT] Saved article lookup failed: %s", saved)
+            saved = None
+        if isinstance(cached, BaseException):
+            logger.warning("[CHATBOT] Cached article lookup failed: %s", cached)
+            cached = None
+        article = saved or cached
+    elif intent == "article_qa" and bookmarks:
+        article = bookmarks[0]  # Default to most recent
+    
+    return {
+        "bookmarks": bookmarks,
+        "read_later": read_later,
+        "analytics": analytics,
+        "cached_articles": cached_articles,
+        "article": article,
+    }
+
+
+async def generate_fallback_reply(
+    intent: str,
+    message: str,
+    article_id: Optional[str],
+    data: dict,
+    llm_context: str,
+) -> tuple[str, bool]:
+    """
+    Rule-based reply for when the main LLM call produced nothing.
+    Returns (reply, used_llm); ELI5 and general queries get one more LLM try.
+    """
+    bookmarks = data["bookmarks"]
+    read_later = data["read_later"]
+    analytics = data["analytics"]
+    article = data["article"]
+    
+    if intent == "summarize_saved":
+        return generate_summarize_saved_response(bookmarks, read_later), False
+    
+    if intent == "daily_briefing":
+        return generate_daily_briefing(bookmarks, read_later, analytics), False
+    
+    if intent == "article_qa" or article_id:
+        return generate_article_qa_response(article, message), False
+    
+    if intent == "top_topics":
+        return generate_top_topics_response(analytics), False
+    
+    if intent == "sentiment_insight":
+        return generate_sentiment_insight(analytics), False
+    
+    if intent == "read_recommendation":
+        return generate_read_recommendation(bookmarks, read_later, analytics), False
+    
+    if intent == "explain_simple":
+        # Try LLM for ELI5 if article available
+        if article:
+            eli5_response = await chat_llm.explain_like_five(
+                article_title=article.get("title", ""),
+                article_content=article.get("description", "") or article.get("content", "")
+            )
+            if eli5_response:
+                return f"🧒 **Simple Explanation**\n\n{eli5_response}", True
+        return generate_explain_simple(article), False
+    
+    if intent == "compare_articles":
+        return generate_compare_articles(bookmarks, read_later), False
+    
+    if intent == "similar_read":
+        return generate_similar_read(bookmarks, read_later, analytics), False
+    
+    if intent == "greeting":
+        return generate_greeting_response(analytics), False
+    
+    if intent == "help":
+        return generate_help_response(), False
+    
+    # General query - try LLM one more time with context
+    llm_response = await chat_llm.send_prompt(
+        context=llm_context,
+        user_message=message,
+        intent="general_query"
+    )
+    if llm_response:
+        return llm_response, True
+    return generate_fallback_response(message), False
+
+
 # --------------------------------------------------
 # Main Chat Endpoint
 # --------------------------------------------------
 @router.post("/message", response_model=ChatMessageResponse)
 async def chat_message(
     request: ChatMessageRequest,
+    background_tasks: BackgroundTasks,
     user=Depends(get_current_user_optional),
     db=Depends(get_db),
 ):
@@ -692,47 +956,25 @@ async def chat_message(
     # Article context override
     article_id = context.get("article_id")
     
-    # Fetch user data + cached news
-    bookmarks = await get_user_bookmarks(db, user_id)
-    read_later = await get_user_read_later(db, user_id)
-    analytics = await get_user_analytics(db, user_id)
-    cached_articles = await get_cached_news_articles(limit_per_category=3)
+    # Trivial intents: no saved items, news cache or LLM context needed
+    if intent == "help" and not article_id:
+        reply = generate_help_response()
+        background_tasks.add_task(store_chat_exchange, db, user_id, message, reply, intent, False)
+        return ChatMessageResponse(reply=reply, intent=intent, sources=[])
     
-    # Fetch specific article if referenced
-    article = None
-    if article_id:
-        # Check user's saved items first, then fall back to cache
-        article = await get_article_by_id(db, user_id, article_id)
-        if not article:
-            article = await find_article_in_cache(article_id)
-    elif intent == "article_qa" and bookmarks:
-        article = bookmarks[0]  # Default to most recent
+    if intent == "greeting" and not article_id:
+        counts = await get_user_counts(db, user_id)
+        reply = generate_greeting_response(counts)
+        background_tasks.add_task(store_chat_exchange, db, user_id, message, reply, intent, False)
+        return ChatMessageResponse(reply=reply, intent=intent, sources=["analytics"])
     
-    sources = []
+    data = await _load_chat_context(db, user_id, intent, article_id)
+    sources = _intent_sources(intent)
     reply = ""
     used_llm = False
     
-    # Determine data sources based on intent
-    if intent in ("summarize_saved", "article_qa", "explain_simple", "compare_articles"):
-        sources = ["bookmarks", "read_later", "news_cache"]
-    elif intent in ("daily_briefing", "read_recommendation", "similar_read", "news_feed"):
-        sources = ["bookmarks", "read_later", "analytics", "news_cache"]
-    elif intent in ("top_topics", "sentiment_insight", "greeting"):
-        sources = ["analytics"]
-    elif intent == "help":
-        sources = []
-    else:
-        sources = ["bookmarks", "read_later", "analytics", "news_cache"]
-    
     # Build context for LLM
-    llm_context = build_llm_context(
-        bookmarks=bookmarks,
-        read_later=read_later,
-        analytics=analytics,
-        article=article,
-        intent=intent,
-        cached_articles=cached_articles,
-    )
+    llm_context = build_llm_context(intent=intent, **data)
     
     # Try LLM first (for non-trivial intents)
     if intent not in ("greeting", "help"):
@@ -750,84 +992,10 @@ async def chat_message(
     # Fallback to rule-based generators
     if not reply:
         logger.info("[CHATBOT] Using fallback generator for intent=%s", intent)
-        
-        if intent == "summarize_saved":
-            reply = generate_summarize_saved_response(bookmarks, read_later)
-        
-        elif intent == "daily_briefing":
-            reply = generate_daily_briefing(bookmarks, read_later, analytics)
-        
-        elif intent == "article_qa" or article_id:
-            reply = generate_article_qa_response(article, message)
-        
-        elif intent == "top_topics":
-            reply = generate_top_topics_response(analytics)
-        
-        elif intent == "sentiment_insight":
-            reply = generate_sentiment_insight(analytics)
-        
-        elif intent == "read_recommendation":
-            reply = generate_read_recommendation(bookmarks, read_later, analytics)
-        
-        elif intent == "explain_simple":
-            # Try LLM for ELI5 if article available
-            if article and not used_llm:
-                eli5_response = await chat_llm.explain_like_five(
-                    article_title=article.get("title", ""),
-                    article_content=article.get("description", "") or article.get("content", "")
-                )
-                if eli5_response:
-                    reply = f"🧒 **Simple Explanation**\n\n{eli5_response}"
-                    used_llm = True
-            
-            if not reply:
-                reply = generate_explain_simple(article)
-        
-        elif intent == "compare_articles":
-            reply = generate_compare_articles(bookmarks, read_later)
-        
-        elif intent == "similar_read":
-            reply = generate_similar_read(bookmarks, read_later, analytics)
-        
-        elif intent == "greeting":
-            reply = generate_greeting_response(analytics)
-        
-        elif intent == "help":
-            reply = generate_help_response()
-        
-        else:
-            # General query - try LLM one more time with context
-            if not used_llm:
-                llm_response = await chat_llm.send_prompt(
-                    context=llm_context,
-                    user_message=message,
-                    intent="general_query"
-                )
-                if llm_response:
-                    reply = llm_response
-                    used_llm = True
-            
-            if not reply:
-                reply = generate_fallback_response(message)
+        reply, used_llm = await generate_fallback_reply(intent, message, article_id, data, llm_context)
     
-    # Optional: Store chat message
-    try:
-        await db.chat_messages.insert_one({
-            "user_id": user_id,
-            "role": "user",
-            "content": message,
-            "created_at": datetime.utcnow(),
-        })
-        await db.chat_messages.insert_one({
-            "user_id": user_id,
-            "role": "assistant",
-            "content": reply,
-            "intent": intent,
-            "used_llm": used_llm,
-            "created_at": datetime.utcnow(),
-        })
-    except Exception as e:
-        logger.warning("[CHATBOT] Failed to store chat: %s", e)
+    # Optional: Store chat message (after the response is sent)
+    background_tasks.add_task(store_chat_exchange, db, user_id, message, reply, intent, used_llm)
     
     logger.info("[CHATBOT] intent=%s sources=%s used_llm=%s", intent, sources, used_llm)
     
@@ -838,9 +1006,86 @@ async def chat_message(
     )
 
 
+# --------------------------------------------------
+# Streaming Chat Endpoint (Server-Sent Events)
+# --------------------------------------------------
+def _sse(payload: dict) -> str:
+    return f"data: {json.dumps(payload)}\n\n"
+
+
+@router.post("/message/stream")
+async def chat_message_stream(
+    request: ChatMessageRequest,
+    background_tasks: BackgroundTasks,
+    user=Depends(get_current_user_optional),
+    db=Depends(get_db),
+):
+    """
+    Same flow as /message, but LLM tokens are forwarded as they are generated.
+    
+    Events: {"delta": "..."} per chunk, then {"done": true, "intent", "sources"}.
+    Rule-based replies arrive as a single delta.
+    """
+    user_id = user["user_id"]
+    message = request.message.strip()
+    context = request.context or {}
+    
+    if not message:
+        raise HTTPException(status_code=400, detail="Message cannot be empty")
+    
+    logger.info("[CHATBOT STREAM] user_id=%s message=%s", user_id, message[:50])
+    
+    intent = detect_intent(message)
+    article_id = context.get("article_id")
+    # Filled while streaming; stored once the response has finished
+    exchange = {"parts": [], "used_llm": False}
+    
+    async def events():
+        reply = None
+        if intent == "help" and not article_id:
+            reply = generate_help_response()
+            sources = []
+        elif intent == "greeting" and not article_id:
+            counts = await get_user_counts(db, user_id)
+            reply = generate_greeting_response(counts)
+            sources = ["analytics"]
+        else:
+            data = await _load_chat_context(db, user_id, intent, article_id)
+            sources = _intent_sources(intent)
+            llm_context = build_llm_context(intent=intent, **data)
+            
+            async for chunk in chat_llm.stream_prompt(llm_context, message, intent=intent):
+                exchange["parts"].append(chunk)
+                exchange["used_llm"] = True
+                yield _sse({"delta": chunk})
+            
+            if not exchange["used_llm"]:
+                logger.info("[CHATBOT STREAM] Using fallback generator for intent=%s", intent)
+                reply, exchange["used_llm"] = await generate_fallback_reply(
+                    intent, message, article_id, data, llm_context
+                )
+        
+        if reply is not None:
+            exchange["parts"].append(reply)
+            yield _sse({"delta": reply})
+        yield _sse({"done": True, "intent": intent, "sources": sources})
+    
+    background_tasks.add_task(_store_streamed_exchange, db, user_id, message, intent, exchange)
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+async def _store_streamed_exchange(db, user_id: str, message: str, intent: str, exchange: dict):
+    reply = "".join(exchange["parts"]).strip()
+    if reply:
+        await store_chat_exchange(db, user_id, message, reply, intent, exchange["used_llm"])
+
+
 # --------------------------------------------------
 # Chat History Endpoint
 # --------------------------------------------------
+CHAT_HISTORY_PROJECTION = {"_id": 0, "role": 1, "content": 1, "intent": 1, "created_at": 1}
+
+
 @router.get("/history")
 async def get_chat_history(
     limit: int = 20,
@@ -850,18 +1095,9 @@ async def get_chat_history(
     """Get recent chat history for the user."""
     user_id = user["user_id"]
     
-    cursor = db.chat_messages.find(
-        {"user_id": user_id}
-    ).sort("created_at", -1).limit(limit)
-    
-    messages = []
-    async for doc in cursor:
-        messages.append({
-            "role": doc.get("role"),
-            "content": doc.get("content"),
-            "intent": doc.get("intent"),
-            "created_at": doc.get("created_at"),
-        })
+    messages = await db.chat_messages.find(
+        {"user_id": user_id}, CHAT_HISTORY_PROJECTION
+    ).sort("created_at", -1).limit(limit).to_list(length=limit)
     
     # Reverse to show oldest first
     messages.reverse()
@@ -1,14 +1,27 @@
+from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException
 from bson import ObjectId
+from app.core.config import settings
 from app.core.database import get_db
 from app.core.auth import get_current_user_optional
 from app.core.cache import get_from_cache, set_in_cache, delete_from_cache
-from app.models.comment import CommentModel, CommentCreateRequest
+from app.models.comment import CommentCreateRequest
 
 router = APIRouter()
 
 # Cache configuration
 COMMENTS_CACHE_TTL = 300  # 5 minutes
+COMMENTS_MAX_RESULTS = 1000
+
+# Fields returned by get_comments
+COMMENT_PROJECTION = {
+    "article_id": 1,
+    "article_title": 1,
+    "text": 1,
+    "user_id": 1,
+    "username": 1,
+    "created_at": 1,
+}
 
 
 @router.post("/")
@@ -30,7 +43,6 @@ async def add_comment(
     await delete_from_cache(cache_key)
 
     # Return the full comment object
-    from datetime import datetime
     now = datetime.utcnow()
     return {
         "id": str(result.inserted_id),
@@ -54,25 +66,22 @@ async def get_comments(article_id: str, db=Depends(get_db)):
         return cached_data
     
     comments = []
-    cursor = db.comments.find(
-        {"article_id": article_id}
-    ).sort("created_at", -1)
-
-    async for comment in cursor:
-        # Convert ObjectId to string for Pydantic validation
-        comment["_id"] = str(comment["_id"])
-        comment_model = CommentModel(**comment)
-        # Convert to dict and ensure proper serialization
-        comment_dict = {
-            "id": comment_model.id or str(comment["_id"]),
-            "article_id": comment_model.article_id,
-            "article_title": comment_model.article_title,
-            "text": comment_model.text,
-            "user_id": comment_model.user_id,
-            "username": comment_model.username,
-            "created_at": comment_model.created_at.isoformat() if hasattr(comment_model.created_at, 'isoformat') else str(comment_model.created_at),
-        }
-        comments.append(comment_dict)
+    docs = await db.comments.find(
+        {"article_id": article_id}, COMMENT_PROJECTION
+    ).sort("created_at", -1).batch_size(settings.MONGO_CURSOR_BATCH_SIZE).to_list(length=COMMENTS_MAX_RESULTS)
+
+    for comment in docs:
+        # Shape the response straight from the trusted DB document
+        created_at = comment.get("created_at") or datetime.utcnow()
+        comments.append({
+            "id": str(comment["_id"]),
+            "article_id": comment["article_id"],
+            "article_title": comment["article_title"],
+            "text": comment["text"],
+            "user_id": comment["user_id"],
+            "username": comment.get("username"),
+            "created_at": created_at.isoformat() if hasattr(created_at, 'isoformat') else str(created_at),
+        })
 
     result = {
         "count": len(comments),
@@ -91,15 +100,21 @@ async def delete_comment(
     user=Depends(get_current_user_optional),
     db=Depends(get_db),
 ):
-    result = await db.comments.delete_one({
-        "_id": ObjectId(comment_id),
-        "user_id": user["user_id"],
-    })
+    if not ObjectId.is_valid(comment_id):
+        raise HTTPException(status_code=400, detail="Invalid id")
 
-    if result.deleted_count == 0:
+    # Returns only article_id, which is needed to invalidate the cached list
+    deleted = await db.comments.find_one_and_delete(
+        {"_id": ObjectId(comment_id), "user_id": user["user_id"]},
+        projection={"_id": 0, "article_id": 1},
+    )
+
+    if not deleted:
         raise HTTPException(
             status_code=404,
             detail="Comment not found or unauthorized",
         )
 
+    await delete_from_cache(f"comments:{deleted['article_id']}")
+
     return {"message": "Comment deleted successfully"}
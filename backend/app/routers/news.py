@@ -1,9 +1,15 @@
-﻿import logging
+﻿import asyncio
+import logging
+import time
+from bisect import bisect_right
+from operator import itemgetter
 from fastapi import APIRouter, HTTPException
-from app.services.news_service import GNewsService
+from fastapi.responses import ORJSONResponse
+from app.services.news_service import GNewsService, GNewsQuotaExceeded
 from app.services.sentiment_ml import SentimentService  # ✅ Use new ML-based sentiment
-from app.core.cache import get_from_cache, set_in_cache, delete_from_cache
+from app.core.cache import get_redis, get_from_cache, get_many_from_cache, set_in_cache, set_many_in_cache, delete_from_cache
 from app.core.gnews_counter import GNewsCounter
+from app.core.config import settings
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -12,6 +18,62 @@ logger = logging.getLogger(__name__)
 CATEGORIES = ["general", "nation", "business", "technology", "sports", "entertainment", "health"]
 
 
+# -----------------------------
+# CATEGORY CACHE WRITES
+# -----------------------------
+def _search_blob(article: dict) -> str:
+    """Lowercased title/description/content/source used by suggestions."""
+    source = article.get("source") or ""
+    if isinstance(source, dict):
+        source = source.get("name") or ""
+    return "\n".join((
+        article.get("title") or "",
+        article.get("description") or "",
+        article.get("content") or "",
+        source,
+    )).lower()
+
+
+# Separates articles in a search haystack; never present in blobs or queries
+SEARCH_SEPARATOR = "\x00"
+
+
+def _search_index(articles: list) -> dict:
+    """One lowercased haystack per feed plus each article's start offset."""
+    blobs = [_search_blob(a).replace(SEARCH_SEPARATOR, " ") for a in articles]
+    offsets = []
+    position = 0
+    for blob in blobs:
+        offsets.append(position)
+        position += len(blob) + len(SEARCH_SEPARATOR)
+    return {"haystack": SEARCH_SEPARATOR.join(blobs), "offsets": offsets}
+
+
+async def cache_category_articles(category: str, articles: list):
+    """
+    Cache a category feed plus its search index (kept in a sibling key).
+    Article content is stripped from the feed (mutates articles) and cached
+    per article under GNewsService.content_cache_key.
+    The feed outlives its freshness marker by CACHE_STALE_NEWS so readers
+    can serve it while a refresh runs (stale-while-revalidate).
+    """
+    ttl = settings.CACHE_TTL_NEWS + settings.CACHE_STALE_NEWS
+    # The index includes content, so build it before content is split off
+    search_index = _search_index(articles)
+    # Listings don't render content; move it to per-article keys
+    contents = {
+        GNewsService.content_cache_key(a["id"]): a.pop("content")
+        for a in articles
+        if a.get("content") and a.get("id")
+    }
+    await asyncio.gather(
+        set_in_cache(f"gnews:{category}", articles, ttl=ttl),
+        set_in_cache(f"gnews:search:{category}", search_index, ttl=ttl),
+        set_in_cache(f"gnews:fresh:{category}", time.time(), ttl=settings.CACHE_TTL_NEWS),
+        set_many_in_cache(contents, ttl=ttl),
+    )
+
+
 # -----------------------------
 # SEARCH SUGGESTIONS (CACHE ONLY)
 # -----------------------------
@@ -30,53 +92,69 @@ async def get_search_suggestions(q: str):
     results = []
     seen_ids = set()
 
-    for category in CATEGORIES:
-        cache_key = f"gnews:{category}"
-        cached = await get_from_cache(cache_key)
+    # One MGET for every category feed and its precomputed search index
+    keys = [f"gnews:{category}" for category in CATEGORIES]
+    search_keys = [f"gnews:search:{category}" for category in CATEGORIES]
+    caches = await get_many_from_cache(keys + search_keys)
+
+    for cache_key, search_key in zip(keys, search_keys):
+        if len(results) >= 6 or SEARCH_SEPARATOR in query_lower:
+            break
+
+        cached = caches.get(cache_key)
         if not cached:
             continue
 
-        for article in cached:
-            title = (article.get("title") or "").lower()
-            description = (article.get("description") or "").lower()
-            content = (article.get("content") or "").lower()
-            source = article.get("source") or ""
-            if isinstance(source, dict):
-                source = source.get("name") or ""
-            source_lower = source.lower()
+        index = caches.get(search_key)
+        if not isinstance(index, dict) or len(index.get("offsets", ())) != len(cached):
+            # Feeds cached before the index existed: build it on the fly
+            index = _search_index(cached)
+        haystack, offsets = index["haystack"], index["offsets"]
 
-            if query_lower not in title and query_lower not in description and query_lower not in content and query_lower not in source_lower:
-                continue
+        # Scan the whole feed with str.find; bisect maps a hit to its article
+        position = haystack.find(query_lower)
+        while position != -1:
+            i = bisect_right(offsets, position) - 1
+            next_start = offsets[i + 1] if i + 1 < len(offsets) else len(haystack)
+            position = haystack.find(query_lower, next_start)
 
+            article = cached[i]
             article_id = article.get("id") or article.get("url")
             if article_id in seen_ids:
                 continue
             seen_ids.add(article_id)
 
-            article_out = dict(article)
-            if isinstance(article_out.get("source"), dict):
-                article_out["source"] = article_out.get("source", {}).get("name") or ""
+            # Copy only when the source needs flattening; cached values are read-only
+            source = article.get("source")
+            if isinstance(source, dict):
+                article = {**article, "source": source.get("name") or ""}
 
-            results.append(article_out)
+            results.append(article)
 
             if len(results) >= 6:
                 break
 
-        if len(results) >= 6:
-            break
-
     logger.info(f"[SUGGESTIONS] query='{query_lower}' | count={len(results)}")
 
-    return {
+    return ORJSONResponse({
         "query": query,
         "count": len(results),
         "articles": results[:6],
-    }
+    })
 
 
 # -----------------------------
 # GET TRENDING HEADLINES (BULLETIN)
 # -----------------------------
+# Ticker fields; every article built by GNewsService carries all of them
+HEADLINE_FIELDS = ("id", "title", "source", "url", "published_at", "category")
+_headline_values = itemgetter(*HEADLINE_FIELDS)
+
+
+def _to_headlines(articles: list) -> list:
+    return [dict(zip(HEADLINE_FIELDS, _headline_values(article))) for article in articles]
+
+
 @router.get("/trending/headlines")
 async def get_trending_headlines(max_items: int = 8):
     """
@@ -91,12 +169,12 @@ async def get_trending_headlines(max_items: int = 8):
     if cached:
         logger.info(f"[CACHE HIT] trending headlines | count={len(cached)}")
         hit_status = await GNewsCounter.get_hit_status()
-        return {
+        return ORJSONResponse({
             "source": "cache",
             "count": len(cached),
             "headlines": cached,
             "hits": hit_status,
-        }
+        })
     
     # Fallback: Use general news cache to avoid extra API hit
     logger.info("[CACHE MISS] trending headlines | checking general news cache...")
@@ -105,27 +183,17 @@ async def get_trending_headlines(max_items: int = 8):
     if general_cache:
         logger.info(f"[CACHE HIT] general news for trending | extracting {max_items} headlines")
         # Extract headlines from cached general news
-        headlines = [
-            {
-                "id": article.get("id"),
-                "title": article.get("title"),
-                "source": article.get("source"),
-                "url": article.get("url"),
-                "published_at": article.get("published_at"),
-                "category": article.get("category", "general"),
-            }
-            for article in general_cache[:max_items]
-        ]
+        headlines = _to_headlines(general_cache[:max_items])
         # Cache the extracted headlines with shorter TTL
         await set_in_cache(cache_key, headlines, ttl=60 * 10)  # 10 min TTL
         logger.info(f"[CACHE SET] trending headlines | count={len(headlines)} | ttl=600s")
         hit_status = await GNewsCounter.get_hit_status()
-        return {
+        return ORJSONResponse({
             "source": "cache",
             "count": len(headlines),
             "headlines": headlines,
             "hits": hit_status,
-        }
+        })
     
     # No cache available - fetch fresh general news (uses 1 API hit)
     logger.warning("[GNEWS HIT] trending headlines | no cache available, fetching fresh...")
@@ -137,52 +205,46 @@ async def get_trending_headlines(max_items: int = 8):
         raise HTTPException(status_code=502, detail=str(e))
     
     # Extract headlines (no sentiment needed for ticker - faster response)
-    headlines = [
-        {
-            "id": article.get("id"),
-            "title": article.get("title"),
-            "source": article.get("source"),
-            "url": article.get("url"),
-            "published_at": article.get("published_at"),
-            "category": article.get("category", "general"),
-        }
-        for article in articles[:max_items]
-    ]
+    headlines = _to_headlines(articles[:max_items])
     
     # Cache trending headlines
     await set_in_cache(cache_key, headlines, ttl=60 * 10)  # 10 min TTL
     logger.info(f"[CACHE SET] trending headlines | count={len(headlines)} | ttl=600s")
     
     # Also cache full articles for general category (avoids double fetch)
-    await set_in_cache("gnews:general", articles)
+    await cache_category_articles("general", articles)
     logger.info(f"[CACHE SET] general news (from trending) | count={len(articles)}")
     
     hit_status = await GNewsCounter.get_hit_status()
     
-    return {
+    return ORJSONResponse({
         "source": "api",
         "count": len(headlines),
         "headlines": headlines,
         "hits": hit_status,
-    }
+    })
 
 # --------------------------------------------------
 # HELPER: Add ML-based sentiment to articles
 # --------------------------------------------------
 async def add_sentiment_to_articles(articles):
     """
-    Calculate sentiment for each article using ML model.
+    Calculate sentiment for all articles using ML model in one batch.
     Combines title + description + content for analysis.
     Includes Redis caching to avoid repeated ML inference.
     """
-    for article in articles:
-        # Use ML service to analyze article sentiment (checks Redis cache first)
-        sentiment_result = await SentimentService.analyze_article(
-            title=article.get('title', ''),
-            description=article.get('description', ''),
-            content=article.get('content', '')
+    texts = [
+        SentimentService.combine_article_text(
+            article.get('title', ''),
+            article.get('description', ''),
+            article.get('content', ''),
         )
-        
+        for article in articles
+    ]
+    # Batched ML inference (checks Redis cache per text first)
+    results = await SentimentService.analyze_batch(texts)
+    
+    for article, sentiment_result in zip(articles, results):
         # Attach sentiment to article
         article["sentiment"] = {
             "label": sentiment_result["label"],
@@ -192,49 +254,100 @@ async def add_sentiment_to_articles(articles):
     
     return articles
 
+# -----------------------------
+# FETCH + CACHE ONE TOPIC (1 HIT)
+# -----------------------------
+async def fetch_and_cache_topic(topic: str) -> list:
+    """Fetch a topic from GNews, add sentiment, and cache it."""
+    articles = await GNewsService.fetch_category(topic)
+    # Add sentiment ONCE before caching (includes per-article Redis caching)
+    articles = await add_sentiment_to_articles(articles)
+    await cache_category_articles(topic, articles)
+    return articles
+
+
+# Single-flight: at most one GNews fetch per topic at a time. Concurrent
+# cold misses and background refreshes await the same task.
+_inflight: dict[str, asyncio.Task] = {}
+
+
+def _fetch_topic_once(topic: str) -> asyncio.Task:
+    """Return the in-flight fetch for a topic, starting one if needed."""
+    task = _inflight.get(topic)
+    if task is None:
+        task = asyncio.create_task(fetch_and_cache_topic(topic))
+        _inflight[topic] = task
+        task.add_done_callback(lambda _: _inflight.pop(topic, None))
+    return task
+
+
+def _schedule_refresh(topic: str):
+    """Refresh a topic in the background (stale-while-revalidate)."""
+    if topic in _inflight:
+        return
+
+    def log_result(task: asyncio.Task):
+        if task.cancelled():
+            return
+        if task.exception():
+            logger.error(f"[SWR REFRESH ERROR] {topic}: {str(task.exception())}")
+        else:
+            logger.info(f"[SWR REFRESHED] {topic}")
+
+    _fetch_topic_once(topic).add_done_callback(log_result)
+
+
 # -----------------------------
 # GET NEWS BY TOPIC (CACHE FIRST)
 # -----------------------------
 @router.get("/topic/{topic}")
 async def get_news_by_topic(topic: str):
     """Fetch news by topic/category with caching"""
+    # Unknown topics would silently fetch "general" and burn a GNews hit
+    if topic not in CATEGORIES:
+        raise HTTPException(status_code=404, detail=f"Unknown topic: {topic}")
+
     # TODO: Future enhancement - include country/language/pagination in cache key
     cache_key = f"gnews:{topic}"
+    fresh_key = f"gnews:fresh:{topic}"
 
-    cached = await get_from_cache(cache_key)
+    found = await get_many_from_cache([cache_key, fresh_key])
+    cached = found.get(cache_key)
     if cached:
-        logger.info(f"[CACHE HIT] {topic}")
+        if fresh_key in found:
+            logger.info(f"[CACHE HIT] {topic}")
+        else:
+            # Past the fresh window: serve stale now, refresh in the background
+            logger.info(f"[CACHE STALE] {topic}")
+            _schedule_refresh(topic)
         # Cached articles ALREADY have sentiment - do NOT recompute
-        # (Sentiment was added before caching, see API fetch branch below)
+        # (Sentiment was added before caching, see fetch_and_cache_topic)
         hit_status = await GNewsCounter.get_hit_status()
-        return {
+        # Returning the Response directly skips FastAPI's jsonable_encoder pass
+        return ORJSONResponse({
             "source": "cache",
             "count": len(cached),
             "articles": cached,
             "hits": hit_status,
-        }
+        })
 
     logger.info(f"[GNEWS HIT] {topic}")
     try:
-        articles = await GNewsService.fetch_category(topic)
+        # Shielded so one client disconnecting doesn't cancel the shared fetch
+        articles = await asyncio.shield(_fetch_topic_once(topic))
     except Exception as e:
         logger.error(f"Error fetching news for {topic}: {str(e)}")
         raise HTTPException(status_code=502, detail=str(e))
-
-    # Add sentiment ONCE before caching (includes per-article Redis caching)
-    articles = await add_sentiment_to_articles(articles)
-    
-    await set_in_cache(cache_key, articles)
     
     # ✅ Get hit status after API call
     hit_status = await GNewsCounter.get_hit_status()
 
-    return {
+    return ORJSONResponse({
         "source": "api",
         "count": len(articles),
         "articles": articles,
         "hits": hit_status,  # ✅ Added
-    }
+    })
 
 # Backward compatibility
 @router.get("/{category}")
@@ -271,6 +384,9 @@ async def reset_hit_counter():
 @router.post("/refresh/{category}")
 async def refresh_category(category: str):
     """Manually refresh news for a specific category"""
+    if category not in CATEGORIES:
+        raise HTTPException(status_code=404, detail=f"Unknown category: {category}")
+
     cache_key = f"gnews:{category}"
     await delete_from_cache(cache_key)
 
@@ -284,7 +400,7 @@ async def refresh_category(category: str):
     # Add sentiment BEFORE caching (computed once, cached with articles)
     articles = await add_sentiment_to_articles(articles)
     
-    await set_in_cache(cache_key, articles)
+    await cache_category_articles(category, articles)
 
     return {
         "message": f"{category} refreshed",
@@ -300,26 +416,93 @@ async def refresh_category(category: str):
 async def refresh_all():
     """Refresh all categories at once"""
     categories = CATEGORIES
-    total_articles = 0
+    refreshed: dict[str, int] = {}
     errors = []
 
-    for cat in categories:
+    async def refresh_one(cat: str):
+        # Cache is overwritten on success, so a failed or cancelled fetch keeps the old feed
         try:
-            await delete_from_cache(f"gnews:{cat}")
             articles = await GNewsService.fetch_category(cat)
             # Add sentiment BEFORE caching (computed once, cached with articles)
             articles = await add_sentiment_to_articles(articles)
-            await set_in_cache(f"gnews:{cat}", articles)
-            total_articles += len(articles)
+            await cache_category_articles(cat, articles)
+            refreshed[cat] = len(articles)
+        except GNewsQuotaExceeded:
+            # Propagates to the TaskGroup, which cancels the remaining fetches
+            raise
         except Exception as e:
             logger.error(f"Error refreshing {cat}: {str(e)}")
             errors.append(f"{cat}: {str(e)}")
 
+    # All categories concurrently; running out of quota stops the rest
+    try:
+        async with asyncio.TaskGroup() as tg:
+            for cat in categories:
+                tg.create_task(refresh_one(cat))
+    except* GNewsQuotaExceeded as eg:
+        logger.error(f"[MANUAL REFRESH ALL] quota exceeded, cancelled remaining: {eg.exceptions[0]}")
+        errors.append(f"quota: {str(eg.exceptions[0])}")
+
+    total_articles = sum(refreshed.values())
+
     logger.warning(f"[MANUAL REFRESH ALL] categories={len(categories)}, articles={total_articles}")
 
     return {
         "message": "All categories refreshed",
-        "categories_refreshed": len(categories),
+        "categories_refreshed": len(refreshed),
         "total_articles": total_articles,
         "errors": errors if errors else None,
     }
+
+
+# -----------------------------
+# CACHE WARMING (BACKGROUND)
+# -----------------------------
+WARMUP_LOCK_KEY = "lock:news:warmup"
+
+
+async def warm_category_caches() -> list:
+    """
+    Fetch categories that have no cached feed at all, within the quota budget.
+    Stale feeds are left to stale-while-revalidate on the next read.
+    """
+    keys = [f"gnews:{category}" for category in CATEGORIES]
+    cached = await get_many_from_cache(keys)
+    missing = [category for category, key in zip(CATEGORIES, keys) if not cached.get(key)]
+    if not missing:
+        return []
+
+    hit_status = await GNewsCounter.get_hit_status()
+    budget = hit_status["remaining_hits"] - settings.NEWS_WARMUP_QUOTA_RESERVE
+    if budget <= 0:
+        logger.info(f"[WARMUP SKIPPED] quota reserve reached | missing={missing}")
+        return []
+
+    missing = missing[:budget]
+    results = await asyncio.gather(
+        *(_fetch_topic_once(category) for category in missing),
+        return_exceptions=True,
+    )
+
+    warmed = []
+    for category, result in zip(missing, results):
+        if isinstance(result, Exception):
+            logger.error(f"[WARMUP ERROR] {category}: {str(result)}")
+        else:
+            warmed.append(category)
+    logger.info(f"[WARMUP] warmed={warmed}")
+    return warmed
+
+
+async def warmup_loop():
+    """Warm missing category feeds every NEWS_WARMUP_INTERVAL seconds."""
+    interval = settings.NEWS_WARMUP_INTERVAL
+    while True:
+        try:
+            client = await get_redis()
+            # One worker per interval does the warming
+            if client is not None and await client.set(WARMUP_LOCK_KEY, "1", nx=True, ex=interval):
+                await warm_category_caches()
+        except Exception as e:
+            logger.error(f"[WARMUP ERROR] {str(e)}")
+        await asyncio.sleep(interval)
@@ -1,26 +1,72 @@
+import asyncio
 import logging
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from fastapi import APIRouter, Depends
 from app.core.database import get_db
 from app.core.auth import get_current_user_optional
+from app.core.cache import get_from_cache, set_in_cache, profile_stats_key, profile_analytics_key
+from app.core.config import settings
+from app.services.user_analytics import UserAnalyticsService, SENTIMENT_LABELS
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
 
+# Responses for requests without a user id (nothing to count)
+ZERO_STATS = {
+    "articles_read": 0,
+    "bookmarks": 0,
+    "read_later": 0,
+    "total_saved": 0,
+}
+
+
+def _zero_analytics() -> dict:
+    return {
+        "tier1": {**ZERO_STATS, "last_active_at": None},
+        "tier2": {
+            "top_category": None,
+            "category_breakdown": [],
+            "weekly_activity": [
+                {"day": label, "count": 0}
+                for label, _ in _last_seven_days(datetime.now(timezone.utc))
+            ],
+        },
+        "tier3": {
+            "sentiment_breakdown": None,
+            "engagement_score": 0,
+            "engagement_label": "Casual Reader",
+        },
+    }
+
+
+def _last_seven_days(now: datetime) -> list[tuple[str, str]]:
+    """(weekday label, YYYY-MM-DD bucket key) for the last 7 days, oldest first."""
+    days = [now - timedelta(days=i) for i in range(6, -1, -1)]
+    return [(f"{day:%a}", f"{day:%Y-%m-%d}") for day in days]
+
+
 @router.get("/stats")
 async def get_profile_stats(
     user=Depends(get_current_user_optional),
     db=Depends(get_db),
 ):
-    user_id = user["user_id"]
-
-    bookmarks_count = await db.bookmarks.count_documents({"user_id": user_id})
-    read_later_count = await db.read_later.count_documents({"user_id": user_id})
+    user_id = user.get("user_id") if user else None
+    if not user_id:
+        return ZERO_STATS
+
+    cache_key = profile_stats_key(user_id)
+    cached = await get_from_cache(cache_key)
+    if cached is not None:
+        return cached
+
+    bookmarks_count, read_later_count, articles_read = await asyncio.gather(
+        db.bookmarks.count_documents({"user_id": user_id}),
+        db.read_later.count_documents({"user_id": user_id}),
+        db.summary_logs.count_documents({"user_id": user_id}),
+    )
     total_saved = bookmarks_count + read_later_count
 
-    articles_read = await db.summary_logs.count_documents({"user_id": user_id})
-
     logger.info(
         "[PROFILE STATS] user_id=%s bookmarks=%s read_later=%s articles_read=%s",
         user_id,
@@ -29,12 +75,14 @@ async def get_profile_stats(
         articles_read,
     )
 
-    return {
+    response = {
         "articles_read": articles_read,
         "bookmarks": bookmarks_count,
         "read_later": read_later_count,
         "total_saved": total_saved,
     }
+    await set_in_cache(cache_key, response, ttl=settings.CACHE_TTL_ANALYTICS)
+    return response
 
 
 @router.get("/analytics")
@@ -42,89 +90,40 @@ async def get_profile_analytics(
     user=Depends(get_current_user_optional),
     db=Depends(get_db),
 ):
-    user_id = user["user_id"]
-
-    bookmarks_count = await db.bookmarks.count_documents({"user_id": user_id})
-    read_later_count = await db.read_later.count_documents({"user_id": user_id})
-    total_saved = bookmarks_count + read_later_count
+    user_id = user.get("user_id") if user else None
+    if not user_id:
+        return _zero_analytics()
 
-    articles_read = await db.summary_logs.count_documents({"user_id": user_id})
+    cache_key = profile_analytics_key(user_id)
+    cached = await get_from_cache(cache_key)
+    if cached is not None:
+        return cached
 
-    latest_bookmark = await db.bookmarks.find_one(
-        {"user_id": user_id},
-        sort=[("created_at", -1)],
-        projection={"created_at": 1}
-    )
-    latest_read_later = await db.read_later.find_one(
-        {"user_id": user_id},
-        sort=[("created_at", -1)],
-        projection={"created_at": 1}
-    )
+    view = await UserAnalyticsService.get(db, user_id)
+    counts = view["counts"]
 
-    last_active_at = None
-    if latest_bookmark and latest_bookmark.get("created_at"):
-        last_active_at = latest_bookmark.get("created_at")
-    if latest_read_later and latest_read_later.get("created_at"):
-        if not last_active_at or latest_read_later.get("created_at") > last_active_at:
-            last_active_at = latest_read_later.get("created_at")
-
-    category_counts: dict[str, int] = {}
-    for collection in (db.bookmarks, db.read_later):
-        pipeline = [
-            {"$match": {"user_id": user_id, "category": {"$exists": True, "$ne": None}}},
-            {"$group": {"_id": "$category", "count": {"$sum": 1}}},
-        ]
-        async for row in collection.aggregate(pipeline):
-            category = row.get("_id")
-            if not category:
-                continue
-            category_counts[category] = category_counts.get(category, 0) + int(row.get("count", 0))
-
-    top_category = None
-    if category_counts:
-        top_category = max(category_counts.items(), key=lambda item: item[1])[0]
+    bookmarks_count = counts.get("bookmarks", 0)
+    read_later_count = counts.get("read_later", 0)
+    articles_read = counts.get("articles_read", 0)
+    total_saved = bookmarks_count + read_later_count
+    last_active_at = view.get("last_active_at")
 
     category_breakdown = [
         {"category": category, "count": count}
-        for category, count in sorted(category_counts.items(), key=lambda item: item[1], reverse=True)
+        for category, count in sorted(view["category_counts"].items(), key=lambda item: item[1], reverse=True)
+        if count > 0
     ]
+    top_category = category_breakdown[0]["category"] if category_breakdown else None
 
-    now = datetime.utcnow()
-    start_date = now - timedelta(days=6)
-    weekly_counts: dict[str, int] = {}
-
-    for collection in (db.bookmarks, db.read_later):
-        cursor = collection.find(
-            {"user_id": user_id, "created_at": {"$gte": start_date}},
-            projection={"created_at": 1}
-        )
-        async for row in cursor:
-            created_at = row.get("created_at")
-            if not isinstance(created_at, datetime):
-                continue
-            day_label = created_at.strftime("%a")
-            weekly_counts[day_label] = weekly_counts.get(day_label, 0) + 1
-
-    weekly_activity = []
-    for i in range(6, -1, -1):
-        day = (now - timedelta(days=i)).strftime("%a")
-        weekly_activity.append({"day": day, "count": weekly_counts.get(day, 0)})
-
-    sentiment_counts = {"Positive": 0, "Neutral": 0, "Negative": 0}
-    sentiment_found = False
-    for collection in (db.bookmarks, db.read_later):
-        cursor = collection.find(
-            {"user_id": user_id, "sentiment": {"$exists": True}},
-            projection={"sentiment": 1}
-        )
-        async for row in cursor:
-            sentiment = row.get("sentiment")
-            if not isinstance(sentiment, dict):
-                continue
-            label = sentiment.get("label")
-            if label in sentiment_counts:
-                sentiment_counts[label] += 1
-                sentiment_found = True
+    daily_counts = view["daily_counts"]
+    weekly_activity = [
+        {"day": label, "count": daily_counts.get(day_key, 0)}
+        for label, day_key in _last_seven_days(datetime.now(timezone.utc))
+    ]
+
+    sentiment_counts = dict.fromkeys(SENTIMENT_LABELS, 0)
+    sentiment_counts.update(view["sentiment_counts"])
+    sentiment_found = any(count > 0 for count in sentiment_counts.values())
 
     engagement_score = articles_read + (bookmarks_count * 2) + read_later_count
     if engagement_score < 10:
@@ -142,13 +141,13 @@ async def get_profile_analytics(
         articles_read,
     )
 
-    return {
+    response = {
         "tier1": {
             "articles_read": articles_read,
             "bookmarks": bookmarks_count,
             "read_later": read_later_count,
             "total_saved": total_saved,
-            "last_active_at": last_active_at,
+            "last_active_at": last_active_at.isoformat() if last_active_at else None,
         },
         "tier2": {
             "top_category": top_category,
@@ -161,3 +160,5 @@ async def get_profile_analytics(
             "engagement_label": engagement_label,
         },
     }
+    await set_in_cache(cache_key, response, ttl=settings.CACHE_TTL_ANALYTICS)
+    return response
@@ -1,11 +1,27 @@
-from fastapi import APIRouter, Depends, HTTPException
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException, Query
 from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
 from app.core.database import get_db
 from app.core.auth import get_current_user_optional
+from app.core.cache import delete_many_from_cache, user_cache_keys
+from app.core.pagination import NEWEST_FIRST, cursor_filter, encode_cursor
+from app.services.user_analytics import UserAnalyticsService, SAVED_ITEM_VIEW_PROJECTION
 from app.models.read_later import ReadLaterModel
 
 router = APIRouter()
 
+# Fields needed to render a read-later card
+READ_LATER_PROJECTION = {
+    "article_id": 1,
+    "title": 1,
+    "source": 1,
+    "category": 1,
+    "url": 1,
+    "image_url": 1,
+    "created_at": 1,
+}
+
 
 @router.post("/")
 async def add_read_later(
@@ -15,18 +31,19 @@ async def add_read_later(
 ):
     user_id = user["user_id"]
 
-    exists = await db.read_later.find_one({
-        "user_id": user_id,
-        "article_id": item.article_id,
-    })
-
-    if exists:
-        raise HTTPException(status_code=400, detail="Already in Read Later")
-
     data = item.dict()
     data["user_id"] = user_id
 
-    result = await db.read_later.insert_one(data)
+    # Unique (user_id, article_id) index rejects duplicates atomically
+    try:
+        result = await db.read_later.insert_one(data)
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail="Already in Read Later")
+
+    await asyncio.gather(
+        delete_many_from_cache(user_cache_keys(user_id)),
+        UserAnalyticsService.record_saved(db, "read_later", data),
+    )
 
     return {
         "message": "Added to Read Later",
@@ -36,23 +53,34 @@ async def add_read_later(
 
 @router.get("/")
 async def get_read_later(
+    limit: int | None = Query(None, ge=1, le=200),
+    cursor: str | None = None,
     user=Depends(get_current_user_optional),
     db=Depends(get_db),
 ):
+    """Newest first. Without a limit the full list is returned."""
     user_id = user["user_id"]
 
-    items = []
-    cursor = db.read_later.find(
-        {"user_id": user_id}
-    ).sort("created_at", -1)
+    query = {"user_id": user_id}
+    if cursor:
+        # Keyset pagination: continue after the last item of the previous page
+        query.update(cursor_filter(cursor))
+
+    find = db.read_later.find(query, READ_LATER_PROJECTION).sort(NEWEST_FIRST)
+    if limit:
+        find = find.limit(limit)
+    items = await find.to_list(length=limit)
+
+    next_cursor = encode_cursor(items[-1]) if limit and len(items) == limit else None
 
-    async for item in cursor:
+    # Projected docs are already response-shaped; skip the model round-trip
+    for item in items:
         item["_id"] = str(item["_id"])
-        items.append(ReadLaterModel(**item))
 
     return {
         "count": len(items),
         "items": items,
+        "next_cursor": next_cursor,
     }
 
 
@@ -62,17 +90,25 @@ async def remove_read_later(
     user=Depends(get_current_user_optional),
     db=Depends(get_db),
 ):
+    if not ObjectId.is_valid(item_id):
+        raise HTTPException(status_code=400, detail="Invalid id")
+
     user_id = user["user_id"]
 
-    result = await db.read_later.delete_one({
-        "_id": ObjectId(item_id),
-        "user_id": user_id,
-    })
+    removed = await db.read_later.find_one_and_delete(
+        {"_id": ObjectId(item_id), "user_id": user_id},
+        projection=SAVED_ITEM_VIEW_PROJECTION,
+    )
 
-    if result.deleted_count == 0:
+    if removed is None:
         raise HTTPException(
             status_code=404,
             detail="Item not found or unauthorized",
         )
 
+    await asyncio.gather(
+        delete_many_from_cache(user_cache_keys(user_id)),
+        UserAnalyticsService.record_removed(db, "read_later", user_id, removed),
+    )
+
     return {"message": "Removed from Read Later"}
@@ -1,8 +1,12 @@
+import asyncio
 from fastapi import APIRouter, HTTPException
 from app.services.sentiment_ml import SentimentService  # ✅ Use new ML-based sentiment
 
 router = APIRouter()
 
+# Single-flight: concurrent requests for the same text share one inference
+_inflight: dict[str, asyncio.Task] = {}
+
 
 @router.post("/")
 async def analyze_sentiment(payload: dict):
@@ -11,8 +15,9 @@ async def analyze_sentiment(payload: dict):
     Returns label (Positive/Neutral/Negative) and confidence score (0-1).
     """
     text = payload.get("text")
+    stripped = text.strip() if isinstance(text, str) else ""
 
-    if not text or len(text.strip()) < 3:
+    if len(stripped) < 3:
         raise HTTPException(
             status_code=400,
             detail="Text is too short for sentiment analysis (minimum 3 characters)"
@@ -21,9 +26,19 @@ async def analyze_sentiment(payload: dict):
     # --------------------------------------------------
     # Analyze sentiment using ML model (service handles caching)
     # --------------------------------------------------
-    result = await SentimentService.analyze(text)
+    cache_key = SentimentService.get_sentiment_cache_key(stripped)
+    task = _inflight.get(cache_key)
+    source = "inflight"
+    if task is None:
+        task = asyncio.create_task(SentimentService.analyze(stripped))
+        _inflight[cache_key] = task
+        task.add_done_callback(lambda _: _inflight.pop(cache_key, None))
+        source = "computed"
+
+    # Shielded so a disconnecting caller doesn't cancel the shared inference
+    result = await asyncio.shield(task)
 
     return {
-        "source": "computed",
+        "source": source,
         "result": result
     }
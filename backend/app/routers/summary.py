@@ -1,21 +1,88 @@
+import asyncio
 import hashlib
-from datetime import datetime
+import logging
+from collections import Counter
+from datetime import datetime, timezone
 from fastapi import APIRouter, HTTPException, Depends
-from app.core.cache import get_from_cache, set_in_cache
-from app.services.summarizer import TextSummarizer
+from app.core.config import settings
+from app.core.cache import get_from_cache, set_in_cache, delete_many_from_cache, user_cache_keys
+from app.services.summarizer import summarize_async
 from app.services.text_utils import extract_article_text
+from app.services.news_service import GNewsService
+from app.services.user_analytics import UserAnalyticsService
 from app.core.auth import get_current_user_optional
-from app.core.database import get_db
+from app.core.database import MongoDB
 
 router = APIRouter()
-summarizer = TextSummarizer()
+logger = logging.getLogger(__name__)
+
+
+# --------------------------------------------------
+# SUMMARY LOG WRITE BUFFER
+# --------------------------------------------------
+# Handlers enqueue; summary_log_flusher writes batches with one insert_many
+_log_queue: asyncio.Queue = asyncio.Queue(maxsize=10_000)
+
+
+def _log_summary(user_id: str, url: str, source: str):
+    """Queue a summary view (profile "articles read") for the next batch write."""
+    try:
+        _log_queue.put_nowait({
+            "user_id": user_id,
+            "url": url,
+            "source": source,
+            "created_at": datetime.now(timezone.utc),
+        })
+    except asyncio.QueueFull:
+        logger.warning(f"[SUMMARY LOG] Queue full; dropping log for {url}")
+
+
+async def _flush_summary_logs(docs: list[dict]):
+    db = MongoDB.get_database()
+    try:
+        await db.summary_logs.insert_many(docs, ordered=False)
+    except Exception as e:
+        logger.error(f"[SUMMARY LOG ERROR] {len(docs)} logs: {str(e)}")
+        return
+
+    reads = Counter(doc["user_id"] for doc in docs)
+    await asyncio.gather(
+        *(UserAnalyticsService.record_read(db, user_id, count) for user_id, count in reads.items()),
+        delete_many_from_cache([key for user_id in reads for key in user_cache_keys(user_id)]),
+        return_exceptions=True,
+    )
+
+
+async def summary_log_flusher():
+    """
+    Write queued summary logs every SUMMARY_LOG_FLUSH_INTERVAL seconds or
+    SUMMARY_LOG_BATCH_SIZE logs, whichever comes first. Drains on cancel.
+    """
+    loop = asyncio.get_running_loop()
+    batch: list[dict] = []
+    try:
+        while True:
+            batch.append(await _log_queue.get())
+            deadline = loop.time() + settings.SUMMARY_LOG_FLUSH_INTERVAL
+            while len(batch) < settings.SUMMARY_LOG_BATCH_SIZE:
+                try:
+                    batch.append(await asyncio.wait_for(_log_queue.get(), deadline - loop.time()))
+                except TimeoutError:
+                    break
+            docs, batch = batch, []
+            await _flush_summary_logs(docs)
+    except asyncio.CancelledError:
+        while not _log_queue.empty():
+            batch.append(_log_queue.get_nowait())
+        if batch:
+            await _flush_summary_logs(batch)
+        raise
 
 
 @router.post("/")
 async def generate_summary(
     payload: dict,
     user=Depends(get_current_user_optional),
-    db=Depends(get_db),
 ):
     """
     Summary rules:
@@ -31,19 +98,14 @@ async def generate_summary(
     if not article_url:
         raise HTTPException(status_code=400, detail="Article URL is required")
 
-    cache_key = "summary:" + hashlib.md5(article_url.encode()).hexdigest()
+    # Cache-only keys; article ids elsewhere stay md5(url)
+    url_hash = hashlib.blake2b(article_url.encode(), digest_size=16).hexdigest()
+    cache_key = "summary:" + url_hash
+    paywall_key = "paywall:" + url_hash
 
     cached = await get_from_cache(cache_key)
     if cached:
-        try:
-            await db.summary_logs.insert_one({
-                "user_id": user["user_id"],
-                "url": article_url,
-                "source": "cache",
-                "created_at": datetime.utcnow(),
-            })
-        except Exception:
-            pass
+        _log_summary(user["user_id"], article_url, "cache")
         return cached
 
     article_text = None
@@ -53,14 +115,28 @@ async def generate_summary(
     # --------------------------------------------------
     # 1️⃣ Prefer full article text (scrape)
     # --------------------------------------------------
-    try:
-        article_text = await extract_article_text(article_url)
-    except Exception:
-        article_text = None
+    # Skip the scrape for URLs that recently yielded no text (paywall)
+    if not await get_from_cache(paywall_key):
+        # Bounded so a slow publisher can't stall the handler
+        try:
+            article_text = await asyncio.wait_for(
+                extract_article_text(article_url), timeout=settings.SUMMARY_SCRAPE_TIMEOUT
+            )
+        except Exception:
+            # Timeouts / fetch errors may be transient; retry on the next request
+            article_text = None
+        else:
+            # Page fetched fine but had no extractable text
+            if not article_text:
+                await set_in_cache(paywall_key, True, ttl=settings.CACHE_TTL_PAYWALL)
 
     # --------------------------------------------------
     # 2️⃣ Fallback to GNews content
     # --------------------------------------------------
+    if not article_text and not gnews_content:
+        # Feed listings no longer carry content; look it up by article id
+        gnews_content = await GNewsService.get_cached_content(GNewsService.article_id(article_url))
+
     if not article_text and gnews_content:
         article_text = gnews_content
 
@@ -69,7 +145,7 @@ async def generate_summary(
     # --------------------------------------------------
     if article_text and len(article_text.split()) >= 200:
         try:
-            summary = summarizer.summarize(
+            summary = await summarize_async(
                 article_text,
                 min_words=100,
                 max_words=120
@@ -100,16 +176,12 @@ async def generate_summary(
         "is_fallback": source != "generated",
     }
 
-    try:
-        await db.summary_logs.insert_one({
-            "user_id": user["user_id"],
-            "url": article_url,
-            "source": source,
-            "created_at": datetime.utcnow(),
-        })
-    except Exception:
-        pass
-
-    await set_in_cache(cache_key, response)
+    # Fallbacks expire sooner so a fixed scrape/summary gets a retry
+    await set_in_cache(
+        cache_key,
+        response,
+        ttl=settings.CACHE_TTL_SUMMARY if source == "generated" else settings.CACHE_TTL_SUMMARY_FALLBACK,
+    )
+    _log_summary(user["user_id"], article_url, source)
 
     return response
@@ -5,15 +5,70 @@ Wraps Ollama HTTP calls for chatbot responses ONLY.
 Does NOT replace summarizer or sentiment_ml services.
 """
 
+import json
 import logging
 import httpx
-from typing import Optional
+from typing import AsyncIterator, Optional
 
 from app.core.config import settings
+from app.core.http import get_http_client
 
 logger = logging.getLogger(__name__)
 
 
+# Generation options for chat replies (buffered and streamed)
+CHAT_OPTIONS = {
+    "temperature": 0.7,
+    "top_p": 0.9,
+    "num_predict": 300,  # Keep short for CPU speed
+    "num_ctx": 2048,     # Limit context window for speed
+}
+
+# Prompt templates, filled per request with str.format_map
+SAFE_PROMPT_TEMPLATE = """You are NewsAura AI Assistant, a helpful personal news assistant.
+
+CRITICAL RULES:
+1. Answer ONLY using the context provided below.
+2. If the context is insufficient, respond with: "I don't have enough information to answer that based on the available articles."
+3. Do NOT make up information, URLs, dates, or statistics.
+4. Use markdown formatting (bold, lists) for readability.
+5. You have access to: the user's bookmarks, read-later items, AND the current news feed articles.
+6. When discussing news feed articles, mention the source and category.
+7. If the user asks about a specific article, provide a 5-8 sentence summary plus 3 concise bullet takeaways.
+8. Do NOT include meta notes like "Note:" and do NOT list "Top Categories" unless the user explicitly asks.
+9. Avoid unrelated analytics unless the user asks for them.
+
+CONTEXT (User's saved articles, analytics, and current news feed):
+{context}
+
+USER QUESTION:
+{user_message}
+
+ASSISTANT RESPONSE:"""
+
+ELI5_PROMPT_TEMPLATE = """You are NewsAura AI Assistant.
+
+Explain the following news article in very simple terms that a 5-year-old could understand.
+Use simple words, short sentences, and fun analogies.
+
+ARTICLE TITLE: {article_title}
+
+ARTICLE CONTENT:
+{article_content}
+
+ELI5 EXPLANATION:"""
+
+TREND_PROMPT_TEMPLATE = """You are NewsAura AI Assistant.
+
+Based on the following analytics data, explain to the user what trends you notice in their reading habits.
+Be insightful but concise.
+
+ANALYTICS DATA:
+{trend_data}
+
+TREND EXPLANATION:"""
+
+
 class ChatLLMService:
     """
     Service for generating chatbot responses using Ollama.
@@ -26,15 +81,16 @@ class ChatLLMService:
         self.base_url = settings.OLLAMA_BASE_URL
         self.model = settings.OLLAMA_MODEL
         self.timeout = settings.OLLAMA_TIMEOUT
+        # Separate connect (10s) and read (full timeout) limits
+        self._request_timeout = httpx.Timeout(self.timeout, connect=10.0)
         self._available: Optional[bool] = None
     
     async def is_available(self) -> bool:
         """Check if Ollama server is running."""
         try:
-            async with httpx.AsyncClient(timeout=5.0) as client:
-                response = await client.get(f"{self.base_url}/api/tags")
-                self._available = response.status_code == 200
-                return self._available
+            response = await get_http_client().get(f"{self.base_url}/api/tags", timeout=5.0)
+            self._available = response.status_code == 200
+            return self._available
         except Exception as e:
             logger.warning("[CHAT_LLM] Ollama not available: %s", e)
             self._available = False
@@ -45,26 +101,7 @@ class ChatLLMService:
         Build a safe prompt that constrains the LLM to ONLY use provided context.
         This prevents hallucinations and ensures answers are data-bound.
         """
-        return f"""You are NewsAura AI Assistant, a helpful personal news assistant.
-
-CRITICAL RULES:
-1. Answer ONLY using the context provided below.
-2. If the context is insufficient, respond with: "I don't have enough information to answer that based on the available articles."
-3. Do NOT make up information, URLs, dates, or statistics.
-4. Use markdown formatting (bold, lists) for readability.
-5. You have access to: the user's bookmarks, read-later items, AND the current news feed articles.
-6. When discussing news feed articles, mention the source and category.
-7. If the user asks about a specific article, provide a 5-8 sentence summary plus 3 concise bullet takeaways.
-8. Do NOT include meta notes like "Note:" and do NOT list "Top Categories" unless the user explicitly asks.
-9. Avoid unrelated analytics unless the user asks for them.
-
-CONTEXT (User's saved articles, analytics, and current news feed):
-{context}
-
-USER QUESTION:
-{user_message}
-
-ASSISTANT RESPONSE:"""
+        return SAFE_PROMPT_TEMPLATE.format_map({"context": context, "user_message": user_message})
 
     async def send_prompt(
         self,
@@ -86,42 +123,34 @@ ASSISTANT RESPONSE:"""
         # Build constrained prompt
         prompt = self._build_safe_prompt(context, user_message)
         
-        # Use separate connect (10s) and read (full timeout) limits
-        timeout = httpx.Timeout(self.timeout, connect=10.0)
-        
         try:
-            async with httpx.AsyncClient(timeout=timeout) as client:
-                response = await client.post(
-                    f"{self.base_url}/api/generate",
-                    json={
-                        "model": self.model,
-                        "prompt": prompt,
-                        "stream": False,
-                        "options": {
-                            "temperature": 0.7,
-                            "top_p": 0.9,
-                            "num_predict": 300,  # Keep short for CPU speed
-                            "num_ctx": 2048,     # Limit context window for speed
-                        }
-                    }
-                )
+            response = await get_http_client().post(
+                f"{self.base_url}/api/generate",
+                timeout=self._request_timeout,
+                json={
+                    "model": self.model,
+                    "prompt": prompt,
+                    "stream": False,
+                    "options": CHAT_OPTIONS,
+                }
+            )
                 
-                if response.status_code != 200:
-                    logger.error("[CHAT_LLM] Ollama returned %d: %s", 
-                                response.status_code, response.text[:200])
-                    return None
+            if response.status_code != 200:
+                logger.error("[CHAT_LLM] Ollama returned %d: %s", 
+                            response.status_code, response.text[:200])
+                return None
                 
-                data = response.json()
-                generated_text = data.get("response", "").strip()
+            data = response.json()
+            generated_text = data.get("response", "").strip()
                 
-                if not generated_text:
-                    logger.warning("[CHAT_LLM] Empty response from Ollama")
-                    return None
+            if not generated_text:
+                logger.warning("[CHAT_LLM] Empty response from Ollama")
+                return None
                 
-                logger.info("[CHAT_LLM] Generated response for intent=%s (len=%d)",
-                           intent, len(generated_text))
+            logger.info("[CHAT_LLM] Generated response for intent=%s (len=%d)",
+                       intent, len(generated_text))
                 
-                return generated_text
+            return generated_text
                 
         except httpx.TimeoutException:
             logger.error("[CHAT_LLM] Ollama request timed out after %ds", self.timeout)
@@ -133,42 +162,87 @@ ASSISTANT RESPONSE:"""
             logger.error("[CHAT_LLM] Unexpected error: %s", e)
             return None
     
+    async def stream_prompt(
+        self,
+        context: str,
+        user_message: str,
+        intent: str = "general"
+    ) -> AsyncIterator[str]:
+        """
+        Like send_prompt, but yields response chunks as Ollama generates them.
+        Yields nothing if Ollama is unavailable or errors before the first chunk.
+        """
+        prompt = self._build_safe_prompt(context, user_message)
+        total = 0
+        
+        try:
+            async with get_http_client().stream(
+                "POST",
+                f"{self.base_url}/api/generate",
+                timeout=self._request_timeout,
+                json={
+                    "model": self.model,
+                    "prompt": prompt,
+                    "stream": True,
+                    "options": CHAT_OPTIONS,
+                }
+            ) as response:
+                if response.status_code != 200:
+                    body = await response.aread()
+                    logger.error("[CHAT_LLM] Ollama returned %d: %s",
+                                response.status_code, body[:200])
+                    return
+                
+                # One JSON object per line; the last one has "done": true
+                async for line in response.aiter_lines():
+                    if not line:
+                        continue
+                    data = json.loads(line)
+                    chunk = data.get("response", "")
+                    if not total:
+                        chunk = chunk.lstrip()
+                    if chunk:
+                        total += len(chunk)
+                        yield chunk
+                    if data.get("done"):
+                        break
+            
+            logger.info("[CHAT_LLM] Streamed response for intent=%s (len=%d)", intent, total)
+        
+        except httpx.TimeoutException:
+            logger.error("[CHAT_LLM] Ollama stream timed out after %ds", self.timeout)
+        except httpx.ConnectError:
+            logger.error("[CHAT_LLM] Cannot connect to Ollama at %s — is 'ollama serve' running?", self.base_url)
+        except Exception as e:
+            logger.error("[CHAT_LLM] Unexpected streaming error: %s", e)
+    
     async def explain_like_five(self, article_title: str, article_content: str) -> Optional[str]:
         """
         Generate an ELI5 (Explain Like I'm 5) explanation of an article.
         """
-        prompt = f"""You are NewsAura AI Assistant.
-
-Explain the following news article in very simple terms that a 5-year-old could understand.
-Use simple words, short sentences, and fun analogies.
-
-ARTICLE TITLE: {article_title}
-
-ARTICLE CONTENT:
-{article_content[:1500]}
-
-ELI5 EXPLANATION:"""
-        
-        timeout = httpx.Timeout(self.timeout, connect=10.0)
+        prompt = ELI5_PROMPT_TEMPLATE.format_map({
+            "article_title": article_title,
+            "article_content": article_content[:1500],
+        })
         
         try:
-            async with httpx.AsyncClient(timeout=timeout) as client:
-                response = await client.post(
-                    f"{self.base_url}/api/generate",
-                    json={
-                        "model": self.model,
-                        "prompt": prompt,
-                        "stream": False,
-                        "options": {
-                            "temperature": 0.8,
-                            "num_predict": 300,
-                        }
+            response = await get_http_client().post(
+                f"{self.base_url}/api/generate",
+                timeout=self._request_timeout,
+                json={
+                    "model": self.model,
+                    "prompt": prompt,
+                    "stream": False,
+                    "options": {
+                        "temperature": 0.8,
+                        "num_predict": 300,
                     }
-                )
+                }
+            )
                 
-                if response.status_code == 200:
-                    return response.json().get("response", "").strip()
-                return None
+            if response.status_code == 200:
+                return response.json().get("response", "").strip()
+            return None
                 
         except Exception as e:
             logger.error("[CHAT_LLM] ELI5 error: %s", e)
@@ -178,35 +252,26 @@ ELI5 EXPLANATION:"""
         """
         Generate a natural language explanation of a trend in user's reading.
         """
-        prompt = f"""You are NewsAura AI Assistant.
-
-Based on the following analytics data, explain to the user what trends you notice in their reading habits.
-Be insightful but concise.
-
-ANALYTICS DATA:
-{trend_data}
-
-TREND EXPLANATION:"""
+        prompt = TREND_PROMPT_TEMPLATE.format_map({"trend_data": trend_data})
         
         try:
-            timeout = httpx.Timeout(self.timeout, connect=10.0)
-            async with httpx.AsyncClient(timeout=timeout) as client:
-                response = await client.post(
-                    f"{self.base_url}/api/generate",
-                    json={
-                        "model": self.model,
-                        "prompt": prompt,
-                        "stream": False,
-                        "options": {
-                            "temperature": 0.7,
-                            "num_predict": 250,
-                        }
+            response = await get_http_client().post(
+                f"{self.base_url}/api/generate",
+                timeout=self._request_timeout,
+                json={
+                    "model": self.model,
+                    "prompt": prompt,
+                    "stream": False,
+                    "options": {
+                        "temperature": 0.7,
+                        "num_predict": 250,
                     }
-                )
+                }
+            )
                 
-                if response.status_code == 200:
-                    return response.json().get("response", "").strip()
-                return None
+            if response.status_code == 200:
+                return response.json().get("response", "").strip()
+            return None
                 
         except Exception as e:
             logger.error("[CHAT_LLM] Trend explanation error: %s", e)
@@ -1,8 +1,10 @@
-import httpx
 import hashlib
+import orjson
 from typing import List, Dict
 from app.core.config import settings
+from app.core.http import get_http_client
 from app.core.gnews_counter import GNewsCounter  # ✅ Added
+from app.core.cache import get_from_cache
 
 ALLOWED_CATEGORIES = [
     "general",
@@ -16,7 +18,25 @@ ALLOWED_CATEGORIES = [
 
 MAX_ARTICLES = 20  # HARD CAP
 
+
+class GNewsQuotaExceeded(Exception):
+    """Daily GNews quota is used up (local counter or HTTP 429 from GNews)."""
+
 class GNewsService:
+    @staticmethod
+    def article_id(url: str) -> str:
+        """Stable article id; stored on saved items, so must stay md5(url)."""
+        return hashlib.md5(url.encode(), usedforsecurity=False).hexdigest()
+
+    @staticmethod
+    def content_cache_key(article_id: str) -> str:
+        """Full article content is cached apart from the category listings."""
+        return f"article:content:{article_id}"
+
+    @staticmethod
+    async def get_cached_content(article_id: str) -> str | None:
+        return await get_from_cache(GNewsService.content_cache_key(article_id))
+
     @staticmethod
     async def fetch_category(category: str) -> List[Dict]:
         if category not in ALLOWED_CATEGORIES:
@@ -25,7 +45,7 @@ class GNewsService:
         # ✅ Check API limit before calling
         can_call, message = await GNewsCounter.check_limit()
         if not can_call:
-            raise Exception(f"GNews API limit: {message}")
+            raise GNewsQuotaExceeded(f"GNews API limit: {message}")
 
         params = {
             "category": category,
@@ -35,27 +55,26 @@ class GNewsService:
             "apikey": settings.GNEWS_API_KEY,
         }
 
-        async with httpx.AsyncClient(timeout=10) as client:
-            response = await client.get(
-                f"{settings.GNEWS_BASE_URL}/top-headlines",
-                params=params
-            )
+        response = await get_http_client().get(
+            f"{settings.GNEWS_BASE_URL}/top-headlines",
+            params=params
+        )
 
+        if response.status_code == 429:
+            raise GNewsQuotaExceeded(f"GNews error 429: {response.text}")
         if response.status_code != 200:
             raise Exception(
                 f"GNews error {response.status_code}: {response.text}"
             )
 
-        data = response.json()
+        data = orjson.loads(response.content)
         articles = []
 
         for item in data.get("articles", []):
             if not item.get("title") or not item.get("url"):
                 continue
 
-            article_id = hashlib.md5(
-                item["url"].encode()
-            ).hexdigest()
+            article_id = GNewsService.article_id(item["url"])
 
             articles.append({
                 "id": article_id,
@@ -1,7 +1,20 @@
+import asyncio
+import hashlib
+import multiprocessing
 import re
 import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from functools import cache
 from typing import List
-from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer
+from app.core.cache import get_from_cache, set_in_cache
+from app.core.config import settings
+
+WHITESPACE_RE = re.compile(r"\s+")
+SENTENCE_BOUNDARY_RE = re.compile(r"(?<=[.!?])\s+")
+# Bitmap of words already in the summary, indexed by word hash
+USED_WORDS_BITS = 18
+USED_WORDS_MASK = (1 << USED_WORDS_BITS) - 1
 
 
 class TextSummarizer:
@@ -11,12 +24,17 @@ class TextSummarizer:
     """
 
     def __init__(self):
-        self.vectorizer = TfidfVectorizer(
+        # Stateless: hashes terms in one pass, no per-article vocabulary
+        self.vectorizer = HashingVectorizer(
+            n_features=2 ** 18,
             stop_words="english",
             ngram_range=(1, 2),
-            max_df=0.85,
-            min_df=2
+            alternate_sign=False,
+            norm=None,
         )
+        self.transformer = TfidfTransformer()
+        self.max_df = 0.85
+        self.min_df = 2
 
     def summarize(
         self,
@@ -48,20 +66,24 @@ class TextSummarizer:
         ranked = np.argsort(scores)[::-1]
 
         selected = []
-        used_words = set()
+        used_words = np.zeros(1 << USED_WORDS_BITS, dtype=bool)
         word_count = 0
 
         for idx in ranked:
             sentence = sentences[idx]
-            words = set(sentence.lower().split())
+            # Distinct words as bitmap slots (hash collisions are rare at 2**18)
+            slots = np.fromiter(
+                (hash(word) & USED_WORDS_MASK for word in set(sentence.lower().split())),
+                dtype=np.intp,
+            )
 
             # ❌ Skip highly redundant sentences
-            overlap = len(words & used_words) / max(len(words), 1)
+            overlap = np.count_nonzero(used_words[slots]) / max(len(slots), 1)
             if overlap > 0.6:
                 continue
 
             selected.append((idx, sentence))
-            used_words |= words
+            used_words[slots] = True
             word_count += len(sentence.split())
 
             if word_count >= min_words or len(selected) >= max_sentences:
@@ -82,8 +104,8 @@ class TextSummarizer:
     # --------------------------------------------------
 
     def _split_sentences(self, text: str) -> List[str]:
-        text = re.sub(r"\s+", " ", text)
-        sentences = re.split(r"(?<=[.!?])\s+", text)
+        text = WHITESPACE_RE.sub(" ", text)
+        sentences = SENTENCE_BOUNDARY_RE.split(text)
         return [
             s.strip()
             for s in sentences
@@ -91,11 +113,89 @@ class TextSummarizer:
         ]
 
     def _score(self, sentences: List[str]) -> np.ndarray:
-        tfidf = self.vectorizer.fit_transform(sentences)
-        scores = tfidf.sum(axis=1).A1
+        counts = self.vectorizer.transform(sentences)
+
+        # Same document-frequency pruning TfidfVectorizer(max_df, min_df) did
+        max_doc_count = self.max_df * len(sentences)
+        if max_doc_count < self.min_df:
+            raise ValueError("max_df corresponds to < documents than min_df")
+        df = np.bincount(counts.indices, minlength=counts.shape[1])
+        keep = (df >= self.min_df) & (df <= max_doc_count)
+        counts.data *= keep[counts.indices]
+        counts.eliminate_zeros()
+        if not counts.nnz:
+            raise ValueError("After pruning, no terms remain")
+
+        tfidf = self.transformer.fit_transform(counts)
+
+        # Row sums straight off the CSR arrays; rows left empty by pruning score 0
+        scores = np.zeros(tfidf.shape[0])
+        non_empty = np.diff(tfidf.indptr) > 0
+        scores[non_empty] = np.add.reduceat(tfidf.data, tfidf.indptr[:-1][non_empty])
 
         # 📰 Strong lead bias (news articles)
         lead_bias = np.linspace(1.6, 0.7, len(scores))
         scores *= lead_bias
 
         return scores
+
+
+@cache
+def get_summarizer() -> TextSummarizer:
+    """Shared summarizer, built on first use instead of at import."""
+    return TextSummarizer()
+
+
+# --------------------------------------------------
+# Worker pool (keeps CPU-bound summarization off the event loop)
+# --------------------------------------------------
+_pool: ProcessPoolExecutor | None = None
+
+
+def init_summary_pool() -> ProcessPoolExecutor:
+    """Create the worker pool. Called once at application startup."""
+    global _pool
+    if _pool is None:
+        # forkserver, not fork: by now torch and the logging listener have started
+        # threads, and forking a multithreaded process can deadlock the child
+        _pool = ProcessPoolExecutor(
+            max_workers=settings.SUMMARY_WORKERS,
+            mp_context=multiprocessing.get_context("forkserver"),
+        )
+    return _pool
+
+
+def close_summary_pool():
+    """Stop the worker pool. Called during application shutdown."""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def _summarize_in_worker(text: str, min_words: int, max_words: int) -> str:
+    # Each worker process builds its own summarizer on first use
+    return get_summarizer().summarize(text, min_words=min_words, max_words=max_words)
+
+
+async def summarize_async(text: str, *, min_words: int = 100, max_words: int = 120) -> str:
+    """
+    Summarize in the worker pool, bounded by SUMMARY_TIMEOUT.
+    Results are cached by text hash, so repeats skip the pool entirely.
+    Raises TimeoutError if the worker takes too long.
+    """
+    # Same text -> same summary; skip the worker round trip on repeats
+    digest = hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+    cache_key = f"summary:text:{digest}:{min_words}:{max_words}"
+    cached = await get_from_cache(cache_key)
+    if cached is not None:
+        return cached
+
+    pool = _pool if _pool is not None else init_summary_pool()
+    loop = asyncio.get_running_loop()
+    summary = await asyncio.wait_for(
+        loop.run_in_executor(pool, _summarize_in_worker, text, min_words, max_words),
+        timeout=settings.SUMMARY_TIMEOUT,
+    )
+    await set_in_cache(cache_key, summary, ttl=settings.CACHE_TTL_SUMMARY)
+    return summary
@@ -1,6 +1,19 @@
-import httpx
 import re
-from bs4 import BeautifulSoup
+from selectolax.lexbor import LexborHTMLParser
+from app.core.http import get_scrape_client
+
+# Browser-like headers; publishers reject bare clients
+SCRAPE_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.5",
+    "Referer": "https://www.google.com/",
+}
+
+# Removed (with their contents) before extracting text
+STRIP_TAGS = ["script", "style", "nav", "footer", "header", "aside", "noscript"]
+CONTENT_CLASS_RE = re.compile(r"(content|article|post|story|text)", re.I)
+WHITESPACE_RE = re.compile(r"\s+")
 
 
 async def extract_article_text(url: str) -> str:
@@ -9,42 +22,37 @@ async def extract_article_text(url: str) -> str:
     Uses simple paragraph-based extraction for clarity.
     """
 
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
-        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
-        "Accept-Language": "en-US,en;q=0.5",
-        "Referer": "https://www.google.com/",
-    }
-
-    async with httpx.AsyncClient(timeout=10.0, follow_redirects=True) as client:
-        try:
-            response = await client.get(url, headers=headers)
-        except Exception as e:
-            raise Exception(f"Failed to fetch URL: {str(e)}")
+    try:
+        response = await get_scrape_client().get(
+            url, headers=SCRAPE_HEADERS, follow_redirects=True, timeout=10.0
+        )
+    except Exception as e:
+        raise Exception(f"Failed to fetch URL: {str(e)}")
 
     if response.status_code != 200:
         raise Exception(f"HTTP {response.status_code}: Failed to fetch article content")
 
-    soup = BeautifulSoup(response.text, "html.parser")
-
-    # Remove non-content elements
-    for tag in soup(["script", "style", "nav", "footer", "header", "aside", "noscript"]):
-        tag.decompose()
+    # Lexbor (C) parses the raw bytes, honouring the page's declared charset
+    tree = LexborHTMLParser(response.content)
+    tree.strip_tags(STRIP_TAGS)
 
     # Try multiple strategies to find content
-    paragraphs = soup.find_all("p")
+    paragraphs = tree.css("p")
     
     if not paragraphs:
         # Fallback: look for divs with text content
-        paragraphs = soup.find_all("div", {"class": re.compile(r"(content|article|post|story|text)", re.I)})
+        paragraphs = [
+            div for div in tree.css("div[class]")
+            if CONTENT_CLASS_RE.search(div.attributes.get("class") or "")
+        ]
     
     if not paragraphs:
         # Last resort: get all text
-        text = soup.get_text()
+        text = tree.root.text() if tree.root is not None else ""
     else:
-        text = " ".join(p.get_text() for p in paragraphs)
+        text = " ".join(p.text() for p in paragraphs)
 
     # Clean excessive whitespace
-    text = re.sub(r"\s+", " ", text).strip()
+    text = WHITESPACE_RE.sub(" ", text).strip()
 
     return text
@@ -0,0 +1,212 @@
+"""
+Per-user analytics materialized view.
+
+One `user_analytics` document per user, updated in place whenever a saved
+item or summary log is written, so the profile page reads a single
+document instead of aggregating raw collections on every request:
+
+    {
+        _id: user_id,
+        counts: {bookmarks, read_later, articles_read},
+        category_counts: {category: n},
+        sentiment_counts: {label: n},
+        daily_counts: {"YYYY-MM-DD": n},
+        last_active_at: datetime,
+        rebuilt_at: datetime,
+    }
+
+Updates never upsert. A user without a view document (older accounts,
+or a failed write) gets it rebuilt from the raw collections on the next
+read, which already includes whatever write was skipped. A write landing
+between a rebuild's scan and its upsert can still be lost, so documents
+are also rebuilt once they are USER_ANALYTICS_REBUILD_INTERVAL old.
+"""
+
+import asyncio
+import logging
+import re
+from datetime import datetime, timedelta
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+SAVED_COLLECTIONS = ("bookmarks", "read_later")
+SENTIMENT_LABELS = ("Positive", "Neutral", "Negative")
+DAY_KEY_FORMAT = "%Y-%m-%d"
+# How many days of daily buckets the view keeps
+DAILY_RETENTION_DAYS = 30
+
+# Fields of a saved item the view depends on
+SAVED_ITEM_VIEW_PROJECTION = {"_id": 0, "created_at": 1, "category": 1, "sentiment.label": 1}
+
+# Categories are client-supplied and become field names under category_counts;
+# "." would nest and "$" is rejected, so both are percent-escaped (with "%" itself)
+_CATEGORY_ESCAPES = {"%": "%25", ".": "%2E", "$": "%24"}
+_CATEGORY_UNESCAPES = {escaped: char for char, escaped in _CATEGORY_ESCAPES.items()}
+_CATEGORY_ESCAPE_RE = re.compile(r"[%.$]")
+_CATEGORY_UNESCAPE_RE = re.compile(r"%(?:25|2E|24)")
+
+
+def _category_field(category: str) -> str:
+    return _CATEGORY_ESCAPE_RE.sub(lambda m: _CATEGORY_ESCAPES[m.group()], category)
+
+
+def _category_name(field: str) -> str:
+    return _CATEGORY_UNESCAPE_RE.sub(lambda m: _CATEGORY_UNESCAPES[m.group()], field)
+
+
+def _daily_cutoff(now: datetime) -> str:
+    """Oldest day key daily_counts keeps."""
+    return f"{now - timedelta(days=DAILY_RETENTION_DAYS):{DAY_KEY_FORMAT}}"
+
+
+def _saved_item_delta(collection: str, item: dict, step: int) -> dict:
+    """$inc document for adding (step=1) or removing (step=-1) one saved item."""
+    inc = {f"counts.{collection}": step}
+
+    category = item.get("category")
+    if category:
+        inc[f"category_counts.{_category_field(category)}"] = step
+
+    label = (item.get("sentiment") or {}).get("label")
+    if label in SENTIMENT_LABELS:
+        inc[f"sentiment_counts.{label}"] = step
+
+    # Days outside the retention window are not tracked (removals included)
+    created_at = item.get("created_at")
+    if isinstance(created_at, datetime):
+        day = f"{created_at:{DAY_KEY_FORMAT}}"
+        if day >= _daily_cutoff(datetime.utcnow()):
+            inc[f"daily_counts.{day}"] = step
+
+    return inc
+
+
+def _rebuild_pipeline(user_id: str, since: datetime) -> list:
+    """Everything the view holds for bookmarks + read_later in one pass."""
+    return [
+        {"$match": {"user_id": user_id}},
+        {"$project": {**SAVED_ITEM_VIEW_PROJECTION, "src": {"$literal": "bookmarks"}}},
+        {"$unionWith": {
+            "coll": "read_later",
+            "pipeline": [
+                {"$match": {"user_id": user_id}},
+                {"$project": {**SAVED_ITEM_VIEW_PROJECTION, "src": {"$literal": "read_later"}}},
+            ],
+        }},
+        {"$facet": {
+            "counts": [{"$group": {"_id": "$src", "n": {"$sum": 1}}}],
+            "latest": [{"$group": {"_id": None, "at": {"$max": "$created_at"}}}],
+            "categories": [
+                {"$match": {"category": {"$ne": None}}},
+                {"$group": {"_id": "$category", "n": {"$sum": 1}}},
+            ],
+            "sentiment": [
+                {"$match": {"sentiment.label": {"$in": list(SENTIMENT_LABELS)}}},
+                {"$group": {"_id": "$sentiment.label", "n": {"$sum": 1}}},
+            ],
+            "daily": [
+                {"$match": {"created_at": {"$gte": since}}},
+                {"$group": {
+                    "_id": {"$dateToString": {"format": DAY_KEY_FORMAT, "date": "$created_at"}},
+                    "n": {"$sum": 1},
+                }},
+            ],
+        }},
+    ]
+
+
+class UserAnalyticsService:
+    """Write-through maintenance and reads of the user_analytics view."""
+
+    @staticmethod
+    async def record_saved(db, collection: str, item: dict):
+        """Count a newly inserted bookmark / read-later item."""
+        await UserAnalyticsService._apply(
+            db, item["user_id"], _saved_item_delta(collection, item, 1), item.get("created_at")
+        )
+
+    @staticmethod
+    async def record_removed(db, collection: str, user_id: str, item: dict):
+        """Uncount a deleted item (item = its SAVED_ITEM_VIEW_PROJECTION fields)."""
+        await UserAnalyticsService._apply(db, user_id, _saved_item_delta(collection, item, -1))
+
+    @staticmethod
+    async def record_read(db, user_id: str, count: int = 1):
+        """Count summary_logs entries."""
+        await UserAnalyticsService._apply(db, user_id, {"counts.articles_read": count})
+
+    @staticmethod
+    async def _apply(db, user_id: str, inc: dict, active_at: datetime | None = None):
+        update = {"$inc": inc}
+        if isinstance(active_at, datetime):
+            update["$max"] = {"last_active_at": active_at}
+        try:
+            before = await db.user_analytics.find_one_and_update(
+                {"_id": user_id}, update, projection={"_id": 0, "daily_counts": 1}
+            )
+            # Drop days that have aged out of the window (at most one extra write a day)
+            cutoff = _daily_cutoff(datetime.utcnow())
+            expired = [day for day in (before or {}).get("daily_counts", {}) if day < cutoff]
+            if expired:
+                await db.user_analytics.update_one(
+                    {"_id": user_id}, {"$unset": {f"daily_counts.{day}": "" for day in expired}}
+                )
+        except Exception as e:
+            logger.error(f"[USER ANALYTICS] Update failed for {user_id}: {e}")
+            # The view is derived data; drop it so the next read rebuilds it
+            try:
+                await db.user_analytics.delete_one({"_id": user_id})
+            except Exception:
+                pass
+
+    @staticmethod
+    async def get(db, user_id: str) -> dict:
+        """
+        Return the user's view document, rebuilding it if missing or too old.
+        category_counts comes back keyed by the original category names.
+        """
+        view = await db.user_analytics.find_one({"_id": user_id})
+        rebuild_before = datetime.utcnow() - timedelta(seconds=settings.USER_ANALYTICS_REBUILD_INTERVAL)
+        if view is None or not view.get("rebuilt_at") or view["rebuilt_at"] < rebuild_before:
+            view = await UserAnalyticsService.rebuild(db, user_id)
+
+        # Skip anything that isn't a plain count (e.g. nested by an old unescaped ".")
+        view["category_counts"] = {
+            _category_name(field): count
+            for field, count in view.get("category_counts", {}).items()
+            if isinstance(count, (int, float))
+        }
+        return view
+
+    @staticmethod
+    async def rebuild(db, user_id: str) -> dict:
+        """Recompute the view from the raw collections and store it."""
+        now = datetime.utcnow()
+        since = datetime.strptime(_daily_cutoff(now), DAY_KEY_FORMAT)
+        rows, articles_read = await asyncio.gather(
+            db.bookmarks.aggregate(_rebuild_pipeline(user_id, since)).to_list(length=1),
+            db.summary_logs.count_documents({"user_id": user_id}),
+        )
+        saved = rows[0] if rows else {}
+
+        counts = {name: 0 for name in SAVED_COLLECTIONS}
+        counts.update({row["_id"]: row["n"] for row in saved.get("counts", [])})
+        counts["articles_read"] = articles_read
+
+        latest = saved.get("latest")
+        view = {
+            "_id": user_id,
+            "counts": counts,
+            "category_counts": {
+                _category_field(row["_id"]): row["n"]
+                for row in saved.get("categories", [])
+                if isinstance(row.get("_id"), str) and row["_id"]
+            },
+            "sentiment_counts": {row["_id"]: row["n"] for row in saved.get("sentiment", [])},
+            "daily_counts": {row["_id"]: row["n"] for row in saved.get("daily", [])},
+            "last_active_at": latest[0].get("at") if latest else None,
+            "rebuilt_at": now,
+        }
+        await db.user_analytics.replace_one({"_id": user_id}, view, upsert=True)
+        return view